@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -11,12 +11,79 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if DATABASE_URL and not DATABASE_URL.startswith("postgresql+psycopg"):
     DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+psycopg://")
 
-engine = create_engine(DATABASE_URL)
+SCHEMA_MANAGEMENT = os.getenv("SCHEMA_MANAGEMENT", "create_all")
+DB_POOL_WARM_CONNECTIONS = int(os.getenv("DB_POOL_WARM_CONNECTIONS", "2"))
+
+_prepare_threshold = os.getenv("DB_PREPARE_THRESHOLD", "5").strip().lower()
+DB_PREPARE_THRESHOLD = None if _prepare_threshold in ("", "none") else int(_prepare_threshold)
+DB_CONNECT_TIMEOUT_SECONDS = int(os.getenv("DB_CONNECT_TIMEOUT_SECONDS", "10"))
+HEALTH_DB_TIMEOUT_SECONDS = int(os.getenv("HEALTH_DB_TIMEOUT_SECONDS", "3"))
+
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Tune every new SQLite connection
+    
+    WAL lets readers in other workers proceed while one writer commits, and
+    synchronous=NORMAL is durable in WAL mode except for the last commits on
+    power loss. busy_timeout makes concurrent writers wait instead of failing.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+if DATABASE_URL and DATABASE_URL.startswith("sqlite"):
+    # Pooled connections move between threadpool threads; each is used by one thread at a time
+    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+else:
+    # psycopg prepares a statement server-side once it has run this many times on a connection;
+    # without connect_timeout an unreachable host blocks a connect for the OS TCP timeout
+    engine = create_engine(DATABASE_URL, connect_args={
+        "prepare_threshold": DB_PREPARE_THRESHOLD,
+        "connect_timeout": DB_CONNECT_TIMEOUT_SECONDS
+    })
+
+def _create_probe_engine():
+    """
+    A one-connection engine for the health prober
+    
+    It never queues behind request traffic on the main pool, and connecting and
+    SELECT 1 are both capped at HEALTH_DB_TIMEOUT_SECONDS, so a slow or
+    unreachable database turns into a failed probe within a few seconds.
+    """
+    if DATABASE_URL and DATABASE_URL.startswith("sqlite"):
+        return create_engine(DATABASE_URL, connect_args={"check_same_thread": False, "timeout": HEALTH_DB_TIMEOUT_SECONDS})
+    return create_engine(
+        DATABASE_URL,
+        connect_args={
+            "connect_timeout": HEALTH_DB_TIMEOUT_SECONDS,
+            "options": f"-c statement_timeout={HEALTH_DB_TIMEOUT_SECONDS * 1000}"
+        },
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=HEALTH_DB_TIMEOUT_SECONDS
+    )
+
+probe_engine = _create_probe_engine()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+def libpq_url() -> str:
+    """Connection string for direct psycopg connections (LISTEN, advisory locks)"""
+    return DATABASE_URL.replace("postgresql+psycopg://", "postgresql://")
+
 def get_db():
     """Get database session"""
     db = SessionLocal()
@@ -26,7 +93,22 @@ def get_db():
         db.close()
 
 def create_tables():
-    """Create all database tables"""
-    from app.models import User, UserSession, EmailVerificationToken, PasswordResetToken
+    """Create all database tables unless the schema is managed by migrations"""
+    if SCHEMA_MANAGEMENT == "migrations":
+        return
+    
+    from app.models import User, UserSession, EmailVerificationToken, PasswordResetToken, AuthEvent, AuthRollup, RollupWatermark, JobRun
     
-    Base.metadata.create_all(bind=engine) 
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+
+def warm_up_pool(connections: int = DB_POOL_WARM_CONNECTIONS) -> int:
+    """Open pool connections ahead of the first request and return them to the pool"""
+    opened = []
+    try:
+        for _ in range(connections):
+            opened.append(engine.connect())
+    finally:
+        for connection in opened:
+            connection.close()
+    return len(opened)
+ 
\ No newline at end of file
@@ -1,12 +1,29 @@
-from fastapi import FastAPI, Request, Depends
-from fastapi.staticfiles import StaticFiles
+from fastapi import Depends, FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import text
+from fastapi.responses import HTMLResponse, JSONResponse
+import asyncio
 import os
-from app.database import get_db, create_tables
-from app.routes import auth_router, user_router
+from sqlalchemy.orm import Session
+from app.database import engine, create_tables, get_db
+from app.schemas.user import UserProfile
+from app.utils.session_utils import SESSION_COOKIE_NAME, get_user_from_session, run_session_renewal_flusher, flush_session_renewals
+from app.utils.cache_bus import run_invalidation_listener
+from app.utils.startup_utils import warm_up
+from app.utils.asset_utils import PrecompressedStaticFiles, asset_url
+from app.utils.page_cache import PageCache
+from app.utils.admission import AdmissionControlMiddleware
+from app.utils.idempotency import IdempotencyMiddleware
+from app.utils.logging_utils import RequestIdMiddleware, configure_logging, shutdown_logging
+from app.utils.tracing import TRACING_ENABLED, TracingMiddleware, instrument_engine
+from app.utils.health import health_state, liveness, readiness, run_health_prober
+from app.utils.auth_events import start_auth_event_writer, stop_auth_event_writer
+from app.utils.scheduler import run_scheduler
+from app.utils.signed_tokens import check_signing_config
+from app.routes import auth_router, user_router, admin_router
+
+configure_logging()
 
 app = FastAPI(
     title="AuthentiCute",
@@ -14,74 +31,131 @@ app = FastAPI(
     version="1.0.0"
 )
 
-app.mount("/static", StaticFiles(directory="static"), name="static")
+if TRACING_ENABLED:
+    instrument_engine(engine)
+
+app.add_middleware(AdmissionControlMiddleware)
+app.add_middleware(IdempotencyMiddleware)
+app.add_middleware(TracingMiddleware)
+app.add_middleware(GZipMiddleware, minimum_size=int(os.getenv("GZIP_MIN_SIZE", "1024")))
+app.add_middleware(RequestIdMiddleware)
+
+app.mount("/static", PrecompressedStaticFiles(directory="static"), name="static")
 
 templates = Jinja2Templates(directory="templates")
+templates.env.globals["asset_url"] = asset_url
+
+page_cache = PageCache(templates)
 
 app.include_router(auth_router)
 app.include_router(user_router)
+app.include_router(admin_router)
+
+background_tasks = []
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database tables on application startup"""
+    """Initialize database tables, warm up the worker and start background tasks"""
+    check_signing_config()
     create_tables()
+    await asyncio.to_thread(warm_up, templates)
+    await asyncio.to_thread(page_cache.render_all)
+    background_tasks.append(asyncio.create_task(run_session_renewal_flusher()))
+    background_tasks.append(asyncio.create_task(run_invalidation_listener()))
+    background_tasks.append(asyncio.create_task(run_health_prober()))
+    background_tasks.append(asyncio.create_task(run_scheduler()))
+    start_auth_event_writer()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background tasks and flush buffered writes"""
+    for task in background_tasks:
+        task.cancel()
+    flush_session_renewals()
+    stop_auth_event_writer()
+    shutdown_logging()
 
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
     """Home page with login/signup options"""
-    return templates.TemplateResponse("index.html", {"request": request})
+    return page_cache.response(request, "index.html")
 
 @app.get("/login", response_class=HTMLResponse)
 async def login_page(request: Request):
     """Login page"""
-    return templates.TemplateResponse("login.html", {"request": request})
+    return page_cache.response(request, "login.html")
 
 @app.get("/signup", response_class=HTMLResponse)
 async def signup_page(request: Request):
     """Signup page"""
-    return templates.TemplateResponse("signup.html", {"request": request})
+    return page_cache.response(request, "signup.html")
 
 @app.get("/verify-email", response_class=HTMLResponse)
-async def verify_email_page(request: Request, token: str = None):
-    """Email verification page"""
-    return templates.TemplateResponse("verify-email.html", {"request": request, "token": token})
+async def verify_email_page(request: Request):
+    """Email verification page (the token is read from the URL client-side)"""
+    return page_cache.response(request, "verify-email.html")
 
 @app.get("/forgot-password", response_class=HTMLResponse)
 async def forgot_password_page(request: Request):
     """Forgot password page"""
-    return templates.TemplateResponse("forgot-password.html", {"request": request})
+    return page_cache.response(request, "forgot-password.html")
 
 @app.get("/reset-password", response_class=HTMLResponse)
-async def reset_password_page(request: Request, token: str = None):
-    """Reset password page"""
-    return templates.TemplateResponse("reset-password.html", {"request": request, "token": token})
+async def reset_password_page(request: Request):
+    """Reset password page (the token is read from the URL client-side)"""
+    return page_cache.response(request, "reset-password.html")
 
 @app.get("/dashboard", response_class=HTMLResponse)
-async def dashboard_page(request: Request):
-    """User dashboard page"""
-    return templates.TemplateResponse("dashboard.html", {"request": request})
+async def dashboard_page(request: Request, db: Session = Depends(get_db)):
+    """
+    User dashboard page
+    
+    With a valid session cookie the profile is embedded in the HTML so the
+    page renders without a follow-up API call; otherwise the cached shell
+    loads the profile client-side.
+    """
+    session_token = request.cookies.get(SESSION_COOKIE_NAME)
+    user = await run_in_threadpool(get_user_from_session, db, session_token) if session_token else None
+    if not user:
+        return page_cache.response(request, "dashboard.html")
+    
+    profile = UserProfile.model_validate(user).model_dump(mode="json")
+    body = templates.env.get_template("dashboard.html").render(initial_profile=profile)
+    return HTMLResponse(content=body, headers={"cache-control": "private, no-store"})
 
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "message": "AuthentiCute is running!"}
 
+@app.get("/api/health/live")
+async def liveness_check():
+    """Liveness probe answered from memory"""
+    alive, payload = liveness()
+    return JSONResponse(status_code=200 if alive else 503, content=payload)
+
+@app.get("/api/health/ready")
+async def readiness_check():
+    """Readiness probe answered from the background prober's cached state"""
+    ready, payload = readiness()
+    return JSONResponse(status_code=200 if ready else 503, content=payload)
+
 @app.get("/api/db-health")
-async def database_health_check(db: Session = Depends(get_db)):
-    """Database health check endpoint"""
-    try:
-        result = db.execute(text("SELECT 1"))
+async def database_health_check():
+    """Database health check answered from the background prober's cached state"""
+    database = health_state["database"]
+    if database["ok"]:
         return {
             "status": "healthy", 
             "message": "Database connection is working!",
-            "database": "connected"
-        }
-    except Exception as e:
-        return {
-            "status": "unhealthy",
-            "message": "Database connection failed",
-            "error": str(e)
+            "database": "connected",
+            "latency_ms": database["latency_ms"]
         }
+    return JSONResponse(status_code=503, content={
+        "status": "unhealthy",
+        "message": "Database connection failed",
+        "error": database["error"]
+    })
 
 if __name__ == "__main__":
     import uvicorn
@@ -2,5 +2,8 @@
 from .user import User
 from .session import UserSession
 from .token import EmailVerificationToken, PasswordResetToken
+from .auth_event import AuthEvent
+from .analytics import AuthRollup, RollupWatermark
+from .job_run import JobRun
 
-__all__ = ["User", "UserSession", "EmailVerificationToken", "PasswordResetToken"] 
\ No newline at end of file
+__all__ = ["User", "UserSession", "EmailVerificationToken", "PasswordResetToken", "AuthEvent", "AuthRollup", "RollupWatermark", "JobRun"] 
\ No newline at end of file
@@ -0,0 +1,27 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+from app.database import Base
+
+class AuthRollup(Base):
+    """Precomputed event counts per hour or day bucket"""
+    __tablename__ = "auth_rollups"
+    
+    granularity = Column(String(8), primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    metric = Column(String(32), primary_key=True)
+    dimension = Column(String(64), primary_key=True)
+    count = Column(BigInteger().with_variant(Integer, "sqlite"), nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<AuthRollup({self.granularity} {self.bucket_start} {self.metric}/{self.dimension}={self.count})>"
+
+class RollupWatermark(Base):
+    """Highest source row id already folded into the rollups, per source"""
+    __tablename__ = "rollup_watermarks"
+    
+    source = Column(String(32), primary_key=True)
+    last_id = Column(BigInteger().with_variant(Integer, "sqlite"), nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<RollupWatermark(source='{self.source}', last_id={self.last_id})>"
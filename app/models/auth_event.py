@@ -0,0 +1,30 @@
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String
+from sqlalchemy.sql import func
+from app.database import Base
+
+class AuthEvent(Base):
+    """
+    Append-only log of authentication events
+    
+    No foreign key to users: events outlive purged accounts. On PostgreSQL
+    migration 003 creates the table partitioned by month on created_at.
+    """
+    __tablename__ = "auth_events"
+    
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    event_type = Column(String(32), nullable=False)
+    user_id = Column(Integer, nullable=True)
+    email = Column(String(255), nullable=True)
+    ip_address = Column(String(45), nullable=True)
+    user_agent = Column(String(255), nullable=True)
+    detail = Column(String(64), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    __table_args__ = (
+        Index("ix_auth_events_created_at", "created_at"),
+        Index("ix_auth_events_user_id_created_at", "user_id", "created_at"),
+        Index("ix_auth_events_ip_address_created_at", "ip_address", "created_at"),
+    )
+    
+    def __repr__(self):
+        return f"<AuthEvent(id={self.id}, event_type='{self.event_type}', user_id={self.user_id})>"
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, DateTime, Float, Index, Integer, String, Text
+from sqlalchemy.sql import func
+from app.database import Base
+
+class JobRun(Base):
+    """History of scheduled maintenance job runs"""
+    __tablename__ = "job_runs"
+    
+    id = Column(Integer, primary_key=True)
+    job_name = Column(String(64), nullable=False)
+    status = Column(String(16), nullable=False)
+    started_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    duration_ms = Column(Float, nullable=True)
+    result = Column(String(255), nullable=True)
+    error = Column(Text, nullable=True)
+    runner = Column(String(128), nullable=True)
+    
+    __table_args__ = (
+        Index("ix_job_runs_job_name_started_at", "job_name", "started_at"),
+    )
+    
+    def __repr__(self):
+        return f"<JobRun(id={self.id}, job_name='{self.job_name}', status='{self.status}')>"
@@ -25,9 +25,9 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
-    sessions = relationship("UserSession", back_populates="user", cascade="all, delete-orphan")
-    verification_tokens = relationship("EmailVerificationToken", back_populates="user", cascade="all, delete-orphan")
-    reset_tokens = relationship("PasswordResetToken", back_populates="user", cascade="all, delete-orphan")
+    sessions = relationship("UserSession", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    verification_tokens = relationship("EmailVerificationToken", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    reset_tokens = relationship("PasswordResetToken", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
     
     def __repr__(self):
         return f"<User(id={self.id}, email='{self.email}', name='{self.name}')>" 
\ No newline at end of file
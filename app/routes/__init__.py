@@ -1,5 +1,6 @@
 # Routes package
 from .auth import router as auth_router
 from .user import router as user_router
+from .admin import router as admin_router
 
-__all__ = ["auth_router", "user_router"] 
\ No newline at end of file
+__all__ = ["auth_router", "user_router", "admin_router"] 
@@ -0,0 +1,148 @@
+import os
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.schemas.user import UserPurgeRequest
+from app.utils.db_utils import purge_users
+from app.utils.export_utils import EXPORT_FORMATS, stream_users
+from app.utils.admission import admission_stats
+from app.utils.idempotency import idempotency_stats
+from app.utils.single_flight import single_flight
+from app.utils.logging_utils import logging_stats
+from app.utils.resilience import resilience_stats
+from app.utils.auth_events import auth_event_stats
+from app.utils.analytics import GRANULARITIES, get_rollups
+from app.utils.scheduler import recent_job_runs, scheduler
+
+router = APIRouter(prefix="/api/admin", tags=["Administration"])
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+def require_admin(x_admin_key: str = Header(None)):
+    """Allow the request only when it carries the configured admin API key"""
+    admin_api_key = os.getenv("ADMIN_API_KEY")
+    
+    if not admin_api_key or not x_admin_key or not secrets.compare_digest(x_admin_key, admin_api_key):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail={
+                "error": {
+                    "message": "Admin access required",
+                    "code": "ADMIN_REQUIRED"
+                }
+            }
+        )
+
+@router.get("/users/export", dependencies=[Depends(require_admin)])
+async def export_users_endpoint(
+    format: str = Query("ndjson"),
+    gzip: bool = False,
+    after_id: int = 0,
+    batch_size: int = Query(1000, ge=1, le=10000)
+):
+    """Stream all users (without password hashes) as NDJSON or CSV"""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unsupported export format. Use one of: {', '.join(EXPORT_FORMATS)}"
+        )
+    
+    filename = f"users.{format}" + (".gz" if gzip else "")
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    
+    return StreamingResponse(
+        stream_users(fmt=format, compress=gzip, after_id=after_id, batch_size=batch_size),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers=headers
+    )
+
+@router.post("/users/purge", dependencies=[Depends(require_admin)])
+async def purge_users_endpoint(request: UserPurgeRequest, db: Session = Depends(get_db)):
+    """Delete users matching all given criteria in bounded batches"""
+    if request.unverified_older_than_days is None and request.user_ids is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Give unverified_older_than_days and/or user_ids"
+        )
+    
+    progress = {"batches": 0, "last_id": None}
+    
+    def record(total, last_id):
+        progress["batches"] += 1
+        progress["last_id"] = last_id
+    
+    total = await run_in_threadpool(
+        purge_users,
+        db,
+        unverified_older_than_days=request.unverified_older_than_days,
+        user_ids=request.user_ids,
+        batch_size=request.batch_size,
+        dry_run=request.dry_run,
+        progress=record
+    )
+    return {"matched" if request.dry_run else "deleted": total, "dry_run": request.dry_run, **progress}
+
+@router.get("/stats", dependencies=[Depends(require_admin)])
+async def stats(
+    granularity: str = Query("day"),
+    metric: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """Signup, login and verification counts from the precomputed rollups"""
+    if granularity not in GRANULARITIES:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unsupported granularity. Use one of: {', '.join(GRANULARITIES)}"
+        )
+    if since is None:
+        since = datetime.now(timezone.utc) - (timedelta(days=30) if granularity == "day" else timedelta(hours=48))
+    
+    return await run_in_threadpool(get_rollups, db, granularity=granularity, metric=metric, since=since, until=until)
+
+@router.get("/admission", dependencies=[Depends(require_admin)])
+async def admission_status():
+    """Current admission control budgets and shedding counters for this worker"""
+    return admission_stats()
+
+@router.get("/idempotency", dependencies=[Depends(require_admin)])
+async def idempotency_status():
+    """Stored idempotency keys, replays and waits for in-flight duplicates on this worker"""
+    return idempotency_stats()
+
+@router.get("/single-flight", dependencies=[Depends(require_admin)])
+async def single_flight_status():
+    """Duplicate lookups absorbed by request coalescing on this worker"""
+    return single_flight.report()
+
+@router.get("/logging", dependencies=[Depends(require_admin)])
+async def logging_status():
+    """Log queue depth and records dropped under overload on this worker"""
+    return logging_stats()
+
+@router.get("/dependencies", dependencies=[Depends(require_admin)])
+async def dependencies_status():
+    """Circuit breaker state, trip counts and bulkhead usage of outbound dependencies on this worker"""
+    return resilience_stats()
+
+@router.get("/auth-events", dependencies=[Depends(require_admin)])
+async def auth_events_status():
+    """Authentication event buffer occupancy, drops and writes on this worker"""
+    return auth_event_stats()
+
+@router.get("/jobs", dependencies=[Depends(require_admin)])
+async def jobs_status(limit: int = Query(50, ge=1, le=500), db: Session = Depends(get_db)):
+    """Scheduler leadership and job state on this worker, plus the cluster's recent run history"""
+    runs = await run_in_threadpool(recent_job_runs, db, limit)
+    return {**scheduler.status(), "recent_runs": runs}
@@ -1,15 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.schemas.auth import UserSignup, UserLogin, UserResponse, SessionResponse, PasswordResetRequest, PasswordReset
 from app.utils.auth_utils import hash_password, verify_password, send_verification_email, send_password_reset_email
-from app.utils.db_utils import get_user_by_email, create_user, verify_user_email
-from app.utils.session_utils import create_user_session, delete_session, get_user_from_session
-from app.utils.token_utils import create_verification_token, get_verification_token, mark_verification_token_used, create_reset_token, get_reset_token, mark_reset_token_used
+from app.utils.db_utils import get_user_by_email, create_user_with_verification_token
+from app.utils.session_utils import create_user_session, delete_session, get_user_from_session, set_session_cookie, clear_session_cookie, request_session_token
+from app.utils.token_utils import issue_reset_token, verify_email_with_token, reset_password_with_token
 from app.utils.oauth_utils import get_google_oauth_url, handle_google_callback
-from app.utils.rate_limiter import auth_rate_limiter, signup_rate_limiter, password_reset_rate_limiter
+from app.utils.rate_limiter import auth_rate_limiter, signup_rate_limiter, password_reset_rate_limiter, email_cooldown_ledger
 from app.utils.client_utils import get_rate_limit_identifier
+from app.utils import auth_events
+from app.utils.auth_events import record_auth_event
 from app.utils.error_handlers import handle_authentication_error, handle_validation_error, handle_rate_limit_error, log_error
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
@@ -23,21 +27,20 @@ async def signup(user_data: UserSignup, request: Request, db: Session = Depends(
         raise handle_rate_limit_error()
     
     try:
-        existing_user = get_user_by_email(db, user_data.email)
-        if existing_user:
-            raise handle_validation_error("Email already registered", "email")
-        
-        hashed_password = hash_password(user_data.password)
+        hashed_password = await run_in_threadpool(hash_password, user_data.password)
         
-        user = create_user(
+        created = create_user_with_verification_token(
             db=db,
             email=user_data.email,
             hashed_password=hashed_password,
             name=user_data.name
         )
+        if not created:
+            raise handle_validation_error("Email already registered", "email")
         
-        verification_token = create_verification_token(db, user.id)
-        email_sent = send_verification_email(user_data.email, verification_token.token)
+        user_id, verification_token = created
+        record_auth_event(auth_events.SIGNUP, request, user_id=user_id, email=user_data.email)
+        email_sent = await run_in_threadpool(send_verification_email, user_data.email, verification_token)
         
         if not email_sent:
             return {
@@ -59,7 +62,7 @@ async def signup(user_data: UserSignup, request: Request, db: Session = Depends(
         )
 
 @router.post("/login", response_model=SessionResponse)
-async def login(user_data: UserLogin, request: Request, db: Session = Depends(get_db)):
+async def login(user_data: UserLogin, request: Request, response: Response, db: Session = Depends(get_db)):
     identifier = get_rate_limit_identifier(request, user_data.email)
     is_allowed, remaining = auth_rate_limiter.is_allowed(identifier)
     
@@ -69,15 +72,20 @@ async def login(user_data: UserLogin, request: Request, db: Session = Depends(ge
     try:
         user = get_user_by_email(db, user_data.email)
         if not user:
+            record_auth_event(auth_events.LOGIN_FAILED, request, email=user_data.email, detail="unknown_email")
             raise handle_authentication_error("Invalid email or password")
         
         if not user.is_active:
+            record_auth_event(auth_events.LOGIN_FAILED, request, user_id=user.id, email=user.email, detail="deactivated")
             raise handle_authentication_error("Account is deactivated", "ACCOUNT_DEACTIVATED")
         
-        if not verify_password(user_data.password, user.hashed_password):
+        if not await run_in_threadpool(verify_password, user_data.password, user.hashed_password):
+            record_auth_event(auth_events.LOGIN_FAILED, request, user_id=user.id, email=user.email, detail="bad_password")
             raise handle_authentication_error("Invalid email or password")
         
         session = create_user_session(db, user.id)
+        record_auth_event(auth_events.LOGIN_SUCCEEDED, request, user_id=user.id, email=user.email)
+        set_session_cookie(response, session)
         
         return SessionResponse(
             session_token=session.session_token,
@@ -119,14 +127,18 @@ async def google_login():
 @router.get("/google/callback")
 async def google_callback(code: str, request: Request, db: Session = Depends(get_db)):
     try:
-        user = handle_google_callback(db, code)
+        user = await run_in_threadpool(handle_google_callback, db, code)
         if not user:
+            record_auth_event(auth_events.LOGIN_FAILED, request, detail="google_oauth")
             raise handle_authentication_error("Failed to authenticate with Google")
         
         session = create_user_session(db, user.id)
+        record_auth_event(auth_events.OAUTH_LOGIN, request, user_id=user.id, email=user.email, detail="google")
         
         redirect_url = f"/dashboard?session_token={session.session_token}"
-        return RedirectResponse(url=redirect_url)
+        response = RedirectResponse(url=redirect_url)
+        set_session_cookie(response, session)
+        return response
         
     except HTTPException:
         raise
@@ -138,15 +150,18 @@ async def google_callback(code: str, request: Request, db: Session = Depends(get
         )
 
 @router.post("/logout")
-async def logout(session_token: str, db: Session = Depends(get_db)):
-    """Logout user and delete session"""
+async def logout(request: Request, response: Response, session_token: Optional[str] = None, db: Session = Depends(get_db)):
+    """Logout user and delete session (the token may come from the query or the session cookie)"""
     try:
-        success = delete_session(db, session_token)
-        if not success:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Session not found"
-            )
+        session_token = request_session_token(request, session_token)
+        session = delete_session(db, session_token) if session_token else None
+        if not session:
+            # Return rather than raise so the cookie is still cleared
+            not_found = JSONResponse(status_code=status.HTTP_404_NOT_FOUND, content={"detail": "Session not found"})
+            clear_session_cookie(not_found)
+            return not_found
+        clear_session_cookie(response)
+        record_auth_event(auth_events.LOGOUT, request, user_id=session.user_id)
         
         return {"message": "Logged out successfully"}
         
@@ -160,15 +175,13 @@ async def logout(session_token: str, db: Session = Depends(get_db)):
         )
 
 @router.get("/verify-email")
-async def verify_email(token: str, db: Session = Depends(get_db)):
+async def verify_email(token: str, request: Request, db: Session = Depends(get_db)):
     """Verify user email with token"""
     try:
-        verification_token = get_verification_token(db, token)
-        if not verification_token:
+        user_id = verify_email_with_token(db, token)
+        if user_id is None:
             raise handle_validation_error("Invalid or expired verification token")
-        
-        mark_verification_token_used(db, token)
-        verify_user_email(db, verification_token.user_id)
+        record_auth_event(auth_events.EMAIL_VERIFIED, request, user_id=user_id)
         
         return {"message": "Email verified successfully!"}
         
@@ -194,10 +207,20 @@ async def forgot_password(request: PasswordResetRequest, req: Request, db: Sessi
         if not user:
             return {"message": "If the email exists, a password reset link has been sent."}
         
-        reset_token = create_reset_token(db, user.id)
-        email_sent = send_password_reset_email(request.email, reset_token.token)
+        cooldown_key = f"password_reset:{user.id}"
+        if not email_cooldown_ledger.should_send(cooldown_key):
+            return {"message": "If the email exists, a password reset link has been sent."}
+        
+        try:
+            reset_token = issue_reset_token(db, user)
+            record_auth_event(auth_events.PASSWORD_RESET_REQUESTED, req, user_id=user.id, email=user.email)
+            email_sent = await run_in_threadpool(send_password_reset_email, request.email, reset_token)
+        except Exception:
+            email_cooldown_ledger.release(cooldown_key)
+            raise
         
         if not email_sent:
+            email_cooldown_ledger.release(cooldown_key)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to send reset email"
@@ -215,18 +238,13 @@ async def forgot_password(request: PasswordResetRequest, req: Request, db: Sessi
         )
 
 @router.post("/reset-password")
-async def reset_password(reset_data: PasswordReset, db: Session = Depends(get_db)):
+async def reset_password(reset_data: PasswordReset, request: Request, db: Session = Depends(get_db)):
     """Reset password with token"""
     try:
-        reset_token = get_reset_token(db, reset_data.token)
-        if not reset_token:
+        user_id = await run_in_threadpool(reset_password_with_token, db, reset_data.token, reset_data.new_password)
+        if user_id is None:
             raise handle_validation_error("Invalid or expired reset token")
-        
-        mark_reset_token_used(db, reset_data.token)
-        hashed_password = hash_password(reset_data.new_password)
-        
-        from app.utils.db_utils import update_user
-        update_user(db, reset_token.user_id, hashed_password=hashed_password)
+        record_auth_event(auth_events.PASSWORD_RESET, request, user_id=user_id)
         
         return {"message": "Password reset successfully!"}
         
@@ -240,10 +258,11 @@ async def reset_password(reset_data: PasswordReset, db: Session = Depends(get_db
         )
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user(session_token: str, db: Session = Depends(get_db)):
+async def get_current_user(request: Request, session_token: Optional[str] = None, db: Session = Depends(get_db)):
     """Get current user from session"""
     try:
-        user = get_user_from_session(db, session_token)
+        session_token = request_session_token(request, session_token)
+        user = await run_in_threadpool(get_user_from_session, db, session_token) if session_token else None
         if not user:
             raise handle_authentication_error("Invalid session")
         
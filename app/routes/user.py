@@ -1,9 +1,11 @@
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.schemas.user import UserProfile, UserProfileUpdate
 from app.utils.db_utils import get_user_by_id, update_user
-from app.utils.session_utils import get_user_from_session
+from app.utils.session_utils import get_user_from_session, request_session_token
 from app.utils.rate_limiter import auth_rate_limiter
 from app.utils.client_utils import get_rate_limit_identifier
 from app.utils.error_handlers import handle_authentication_error, handle_validation_error, log_error
@@ -11,7 +13,7 @@ from app.utils.error_handlers import handle_authentication_error, handle_validat
 router = APIRouter(prefix="/api/users", tags=["User Management"])
 
 @router.get("/profile", response_model=UserProfile)
-async def get_user_profile(session_token: str, request: Request, db: Session = Depends(get_db)):
+async def get_user_profile(request: Request, session_token: Optional[str] = None, db: Session = Depends(get_db)):
     identifier = get_rate_limit_identifier(request)
     is_allowed, remaining = auth_rate_limiter.is_allowed(identifier)
     
@@ -22,7 +24,8 @@ async def get_user_profile(session_token: str, request: Request, db: Session = D
         )
     
     try:
-        user = get_user_from_session(db, session_token)
+        session_token = request_session_token(request, session_token)
+        user = await run_in_threadpool(get_user_from_session, db, session_token) if session_token else None
         if not user:
             raise handle_authentication_error("Invalid session")
         
@@ -52,8 +55,8 @@ async def get_user_profile(session_token: str, request: Request, db: Session = D
 @router.put("/profile", response_model=UserProfile)
 async def update_user_profile(
     profile_data: UserProfileUpdate,
-    session_token: str,
     request: Request,
+    session_token: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     identifier = get_rate_limit_identifier(request)
@@ -66,7 +69,8 @@ async def update_user_profile(
         )
     
     try:
-        user = get_user_from_session(db, session_token)
+        session_token = request_session_token(request, session_token)
+        user = await run_in_threadpool(get_user_from_session, db, session_token) if session_token else None
         if not user:
             raise handle_authentication_error("Invalid session")
         
@@ -112,8 +116,8 @@ async def update_user_profile(
 @router.get("/{user_id}", response_model=UserProfile)
 async def get_user_by_id_endpoint(
     user_id: int,
-    session_token: str,
     request: Request,
+    session_token: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     identifier = get_rate_limit_identifier(request)
@@ -126,11 +130,12 @@ async def get_user_by_id_endpoint(
         )
     
     try:
-        user = get_user_from_session(db, session_token)
+        session_token = request_session_token(request, session_token)
+        user = await run_in_threadpool(get_user_from_session, db, session_token) if session_token else None
         if not user:
             raise handle_authentication_error("Invalid session")
         
-        target_user = get_user_by_id(db, user_id)
+        target_user = await run_in_threadpool(get_user_by_id, db, user_id)
         if not target_user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -1,5 +1,5 @@
 # Schemas package
 from .auth import UserSignup, UserLogin, UserResponse, SessionResponse
-from .user import UserProfile, UserProfileUpdate
+from .user import UserProfile, UserProfileUpdate, UserPurgeRequest
 
-__all__ = ["UserSignup", "UserLogin", "UserResponse", "SessionResponse", "UserProfile", "UserProfileUpdate"] 
\ No newline at end of file
+__all__ = ["UserSignup", "UserLogin", "UserResponse", "SessionResponse", "UserProfile", "UserProfileUpdate", "UserPurgeRequest"] 
\ No newline at end of file
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field
+from typing import List, Optional
 from datetime import datetime
 
 class UserProfile(BaseModel):
@@ -23,4 +23,11 @@ class UserProfileUpdate(BaseModel):
     """Schema for user profile update request"""
     name: Optional[str] = None
     phone: Optional[str] = None
-    bio: Optional[str] = None 
\ No newline at end of file
+    bio: Optional[str] = None
+
+class UserPurgeRequest(BaseModel):
+    """Schema for bulk user purge request"""
+    unverified_older_than_days: Optional[int] = Field(None, ge=1)
+    user_ids: Optional[List[int]] = None
+    batch_size: int = Field(500, ge=1, le=5000)
+    dry_run: bool = False
@@ -0,0 +1,211 @@
+import asyncio
+import json
+import math
+import os
+import time
+from collections import deque
+from typing import Dict, Optional
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+STRICT_PATHS = (
+    "/api/auth/signup",
+    "/api/auth/login",
+    "/api/auth/forgot-password",
+    "/api/auth/reset-password"
+)
+EXEMPT_PREFIXES = ("/api/health", "/api/db-health", "/static")
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted in time"""
+    
+    def __init__(self, reason: str):
+        self.reason = reason
+        super().__init__(reason)
+
+class AdmissionBudget:
+    """
+    Concurrency budget with a bounded FIFO queue and CoDel-style shedding
+    
+    Requests beyond max_concurrent wait in the queue for at most queue_timeout.
+    When every request leaving the queue during a full interval waited longer
+    than target_delay, the budget is considered overloaded and new arrivals that
+    would have to queue are rejected immediately until the queue drains.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        max_concurrent: int,
+        max_queue: int,
+        queue_timeout: float,
+        target_delay: float,
+        interval: float
+    ):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.target_delay = target_delay
+        self.interval = interval
+        self.in_flight = 0
+        self.waiters: deque = deque()
+        self.first_above_time: Optional[float] = None
+        self.overloaded = False
+        self.admitted = 0
+        self.rejected: Dict[str, int] = {"queue_full": 0, "overloaded": 0, "deadline": 0}
+    
+    def _observe(self, sojourn: float):
+        """Track queueing delay the way CoDel tracks packet sojourn time"""
+        now = time.monotonic()
+        if sojourn < self.target_delay:
+            self.first_above_time = None
+            self.overloaded = False
+        elif self.first_above_time is None:
+            self.first_above_time = now + self.interval
+        elif now >= self.first_above_time:
+            self.overloaded = True
+    
+    async def acquire(self):
+        """Wait for a slot or raise AdmissionRejected"""
+        if self.in_flight < self.max_concurrent and not self.waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            self._observe(0.0)
+            return
+        
+        if self.overloaded:
+            self.rejected["overloaded"] += 1
+            raise AdmissionRejected("overloaded")
+        if len(self.waiters) >= self.max_queue:
+            self.rejected["queue_full"] += 1
+            raise AdmissionRejected("queue_full")
+        
+        enqueued_at = time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            self._observe(time.monotonic() - enqueued_at)
+            self.rejected["deadline"] += 1
+            raise AdmissionRejected("deadline")
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        
+        self.admitted += 1
+        self._observe(time.monotonic() - enqueued_at)
+    
+    def _abandon(self, waiter: asyncio.Future):
+        """Give up a queue position; a slot handed over just as the wait ended is passed on"""
+        if waiter.done() and not waiter.cancelled():
+            self.release()
+            return
+        waiter.cancel()
+        # Drop it now so the queue bound and the fast path only see live waiters
+        try:
+            self.waiters.remove(waiter)
+        except ValueError:
+            pass
+    
+    def release(self):
+        """Hand the slot to the next live waiter, or free it"""
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+    
+    def stats(self) -> Dict:
+        return {
+            "in_flight": self.in_flight,
+            "queued": len(self.waiters),
+            "max_concurrent": self.max_concurrent,
+            "overloaded": self.overloaded,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected)
+        }
+
+def _env_ms(name: str, default: str) -> float:
+    return float(os.getenv(name, default)) / 1000
+
+budgets: Dict[str, AdmissionBudget] = {
+    "strict": AdmissionBudget(
+        "strict",
+        max_concurrent=int(os.getenv("ADMISSION_STRICT_CONCURRENCY", "4")),
+        max_queue=int(os.getenv("ADMISSION_STRICT_QUEUE", "32")),
+        queue_timeout=_env_ms("ADMISSION_STRICT_QUEUE_TIMEOUT_MS", "2000"),
+        target_delay=_env_ms("ADMISSION_TARGET_DELAY_MS", "100"),
+        interval=_env_ms("ADMISSION_INTERVAL_MS", "500")
+    ),
+    "loose": AdmissionBudget(
+        "loose",
+        max_concurrent=int(os.getenv("ADMISSION_LOOSE_CONCURRENCY", "64")),
+        max_queue=int(os.getenv("ADMISSION_LOOSE_QUEUE", "256")),
+        queue_timeout=_env_ms("ADMISSION_LOOSE_QUEUE_TIMEOUT_MS", "1000"),
+        target_delay=_env_ms("ADMISSION_TARGET_DELAY_MS", "100"),
+        interval=_env_ms("ADMISSION_INTERVAL_MS", "500")
+    )
+}
+
+def budget_for_path(path: str) -> Optional[AdmissionBudget]:
+    """Pick the budget for a request path (None means the path is never shed)"""
+    if path.startswith(EXEMPT_PREFIXES):
+        return None
+    if path in STRICT_PATHS:
+        return budgets["strict"]
+    return budgets["loose"]
+
+def admission_stats() -> Dict[str, Dict]:
+    return {name: budget.stats() for name, budget in budgets.items()}
+
+class AdmissionControlMiddleware:
+    """ASGI middleware that admits requests against per-route budgets and sheds with fast 503s"""
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        budget = budget_for_path(scope["path"])
+        if budget is None:
+            await self.app(scope, receive, send)
+            return
+        
+        try:
+            await budget.acquire()
+        except AdmissionRejected as e:
+            await self._reject(send, budget, e.reason)
+            return
+        
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            budget.release()
+    
+    async def _reject(self, send: Send, budget: AdmissionBudget, reason: str):
+        retry_after = max(1, math.ceil(budget.interval + budget.target_delay))
+        body = json.dumps({
+            "detail": {
+                "error": {
+                    "message": "Service is busy. Please try again shortly.",
+                    "code": "SERVICE_OVERLOADED",
+                    "details": {"retry_after": retry_after, "reason": reason}
+                }
+            }
+        }).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode())
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
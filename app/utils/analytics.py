@@ -0,0 +1,171 @@
+import os
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from app.models.analytics import AuthRollup, RollupWatermark
+from app.models.auth_event import AuthEvent
+from app.models.user import User
+from app.utils.db_utils import dialect_insert
+
+ROLLUP_SETTLE_SECONDS = int(os.getenv("ROLLUP_SETTLE_SECONDS", "120"))
+ROLLUP_CHUNK_SIZE = int(os.getenv("ROLLUP_CHUNK_SIZE", "5000"))
+
+GRANULARITIES = ("hour", "day")
+
+def bucket_start(value: datetime, granularity: str) -> datetime:
+    """Truncate a timestamp to the start of its UTC hour or day"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    value = value.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        value = value.replace(hour=0)
+    return value
+
+class RollupSource:
+    """An append-mostly table folded into the rollups by increasing id"""
+    
+    def __init__(self, name: str, id_column, created_at_column, columns: List, classify: Callable[[Any], Tuple[str, str]]):
+        self.name = name
+        self.id_column = id_column
+        self.created_at_column = created_at_column
+        self.columns = columns
+        self.classify = classify
+
+ROLLUP_SOURCES = [
+    # Accounts created, by sign-up method
+    RollupSource(
+        "users", User.id, User.created_at, [User.oauth_provider],
+        lambda row: ("signups", row.oauth_provider or "password")
+    ),
+    # Logins (password vs google), failed logins by reason, verifications, resets, logouts
+    RollupSource(
+        "auth_events", AuthEvent.id, AuthEvent.created_at, [AuthEvent.event_type, AuthEvent.detail],
+        lambda row: (row.event_type, row.detail or ("password" if row.event_type == "login_succeeded" else "all"))
+    )
+]
+
+def _read_watermark(db: Session, source: str) -> int:
+    last_id = db.execute(select(RollupWatermark.last_id).where(RollupWatermark.source == source)).scalar()
+    return last_id or 0
+
+def _ensure_watermark(db: Session, source: str):
+    stmt = dialect_insert(db, RollupWatermark).values(source=source, last_id=0)
+    db.execute(stmt.on_conflict_do_nothing(index_elements=["source"]))
+    db.commit()
+
+def _fold_chunk(db: Session, source: str, counts: Counter, previous_id: int, last_id: int) -> bool:
+    """
+    Advance the watermark and add one chunk of counts in the same transaction
+    
+    The watermark moves with a compare-and-set from previous_id, which also
+    locks its row until commit, so when two refreshes race only the one that
+    claims the chunk adds its counts; the other rolls back and returns False.
+    """
+    claimed = db.execute(
+        update(RollupWatermark)
+        .where(RollupWatermark.source == source, RollupWatermark.last_id == previous_id)
+        .values(last_id=last_id, updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not claimed:
+        db.rollback()
+        return False
+    
+    if counts:
+        stmt = dialect_insert(db, AuthRollup).values([
+            {"granularity": granularity, "bucket_start": bucket, "metric": metric, "dimension": dimension, "count": count}
+            for (granularity, bucket, metric, dimension), count in counts.items()
+        ])
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["granularity", "bucket_start", "metric", "dimension"],
+            set_={"count": AuthRollup.count + stmt.excluded["count"]}
+        ))
+    db.commit()
+    return True
+
+def refresh_source(db: Session, source: RollupSource, chunk_size: int = ROLLUP_CHUNK_SIZE) -> int:
+    """
+    Fold rows newer than the source's watermark into the rollups
+    
+    Rows are read in id order and only up to the first one younger than the
+    settle window, so rows still being written are picked up next time
+    instead of being skipped by the watermark. Concurrent refreshes are safe:
+    a chunk another refresh already claimed ends this one.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=ROLLUP_SETTLE_SECONDS)
+    _ensure_watermark(db, source.name)
+    watermark = _read_watermark(db, source.name)
+    folded = 0
+    
+    while True:
+        rows = db.execute(
+            select(source.id_column.label("id"), source.created_at_column.label("created_at"), *source.columns)
+            .where(source.id_column > watermark)
+            .order_by(source.id_column)
+            .limit(chunk_size)
+        ).all()
+        # End the read so the write below starts from a fresh snapshot (SQLite cannot upgrade a stale one)
+        db.commit()
+        
+        counts = Counter()
+        settled = 0
+        last_id = watermark
+        for row in rows:
+            created_at = row.created_at if row.created_at.tzinfo else row.created_at.replace(tzinfo=timezone.utc)
+            if created_at > cutoff:
+                break
+            metric, dimension = source.classify(row)
+            for granularity in GRANULARITIES:
+                counts[(granularity, bucket_start(created_at, granularity), metric, dimension)] += 1
+            last_id = row.id
+            settled += 1
+        
+        if not settled:
+            return folded
+        if not _fold_chunk(db, source.name, counts, watermark, last_id):
+            return folded
+        watermark = last_id
+        folded += settled
+        if settled < len(rows) or len(rows) < chunk_size:
+            return folded
+
+def refresh_rollups(db: Session, progress: Optional[Callable[[str, int], None]] = None) -> Dict[str, int]:
+    """Incrementally refresh every rollup source; returns the rows folded per source"""
+    folded = {}
+    for source in ROLLUP_SOURCES:
+        folded[source.name] = refresh_source(db, source)
+        if progress:
+            progress(source.name, folded[source.name])
+    return folded
+
+def get_rollups(
+    db: Session,
+    granularity: str = "day",
+    metric: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """Read rollup rows in bucket order together with the current watermarks"""
+    stmt = select(AuthRollup).where(AuthRollup.granularity == granularity)
+    if metric:
+        stmt = stmt.where(AuthRollup.metric == metric)
+    if since:
+        stmt = stmt.where(AuthRollup.bucket_start >= since)
+    if until:
+        stmt = stmt.where(AuthRollup.bucket_start < until)
+    
+    rows = db.execute(stmt.order_by(AuthRollup.bucket_start, AuthRollup.metric, AuthRollup.dimension)).scalars().all()
+    watermarks = db.execute(select(RollupWatermark)).scalars().all()
+    return {
+        "granularity": granularity,
+        "rows": [
+            {"bucket_start": row.bucket_start, "metric": row.metric, "dimension": row.dimension, "count": row.count}
+            for row in rows
+        ],
+        "watermarks": {
+            watermark.source: {"last_id": watermark.last_id, "updated_at": watermark.updated_at}
+            for watermark in watermarks
+        }
+    }
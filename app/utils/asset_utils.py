@@ -0,0 +1,245 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+from functools import lru_cache
+from typing import Dict, List, Optional, Set
+from urllib.parse import urljoin
+import requests
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+STATIC_DIR = "static"
+TEMPLATES_DIR = "templates"
+DIST_DIR = "dist"
+VENDOR_DIR = "vendor"
+MANIFEST_NAME = "manifest.json"
+
+VENDOR_SOURCES = {
+    "tailwind.min.css": "https://cdn.jsdelivr.net/npm/tailwindcss@2.2.19/dist/tailwind.min.css",
+    "fontawesome/css/all.min.css": "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css"
+}
+
+BUNDLE_SOURCES = [
+    ("tailwind.min.css", True),
+    ("fontawesome/css/all.min.css", True),
+    ("../css/style.css", False)
+]
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_CACHE_CONTROL = "public, max-age=3600"
+
+CANDIDATE_TOKEN = re.compile(r"[A-Za-z0-9_:/.\-]+")
+CLASS_SELECTOR = re.compile(r"\.((?:\\.|[A-Za-z0-9_\-])+)")
+CSS_URL = re.compile(r"url\(\s*['\"]?([^'\")]+)['\"]?\s*\)")
+
+def collect_used_tokens(templates_dir: str = TEMPLATES_DIR) -> Set[str]:
+    """Collect every class-like token from the templates (Tailwind's default purge extractor)"""
+    tokens = set()
+    for root, _, files in os.walk(templates_dir):
+        for name in files:
+            with open(os.path.join(root, name), "r", encoding="utf-8") as f:
+                tokens.update(CANDIDATE_TOKEN.findall(f.read()))
+    return tokens
+
+def _split_blocks(css: str) -> List[tuple]:
+    """Split a stylesheet into (prelude, body) pairs, with body None for statements like @import"""
+    blocks = []
+    i, length = 0, len(css)
+    while i < length:
+        brace = css.find("{", i)
+        if brace == -1:
+            break
+        start = i
+        while start < brace and css[start].isspace():
+            start += 1
+        if css.startswith("@", start):
+            semicolon = css.find(";", start, brace)
+            if semicolon != -1:
+                blocks.append((css[i:semicolon + 1].strip(), None))
+                i = semicolon + 1
+                continue
+        
+        depth, j = 1, brace + 1
+        while j < length and depth:
+            if css[j] == "{":
+                depth += 1
+            elif css[j] == "}":
+                depth -= 1
+            j += 1
+        blocks.append((css[i:brace].strip(), css[brace + 1:j - 1]))
+        i = j
+    return blocks
+
+def _selector_used(selector: str, used: Set[str]) -> bool:
+    """A selector survives when every class it references appears in the templates"""
+    classes = CLASS_SELECTOR.findall(selector)
+    return all(re.sub(r"\\(.)", r"\1", name) in used for name in classes)
+
+def purge_css(css: str, used: Set[str]) -> str:
+    """Drop rules whose selectors only reference classes that are never used"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    output = []
+    for prelude, body in _split_blocks(css):
+        if body is None:
+            output.append(prelude)
+        elif prelude.startswith(("@media", "@supports")):
+            inner = purge_css(body, used)
+            if inner:
+                output.append(f"{prelude}{{{inner}}}")
+        elif prelude.startswith("@"):
+            output.append(f"{prelude}{{{body}}}")
+        else:
+            selectors = [s for s in prelude.split(",") if _selector_used(s, used)]
+            if selectors:
+                output.append(f"{','.join(s.strip() for s in selectors)}{{{body.strip()}}}")
+    return "".join(output)
+
+def _fingerprint(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()[:12]
+
+def _write_variants(path: str, content: bytes) -> List[str]:
+    """Write a file plus its gzip (and brotli, when available) variants"""
+    with open(path, "wb") as f:
+        f.write(content)
+    written = [path]
+    
+    with open(f"{path}.gz", "wb") as f:
+        f.write(gzip.compress(content, compresslevel=9, mtime=0))
+    written.append(f"{path}.gz")
+    
+    try:
+        import brotli
+    except ImportError:
+        return written
+    with open(f"{path}.br", "wb") as f:
+        f.write(brotli.compress(content, quality=11))
+    written.append(f"{path}.br")
+    return written
+
+def fetch_vendor_assets(static_dir: str = STATIC_DIR, sources: Dict[str, str] = VENDOR_SOURCES) -> List[str]:
+    """Download the CDN stylesheets (and the fonts they reference) into static/vendor"""
+    fetched = []
+    for relative_path, url in sources.items():
+        target = os.path.join(static_dir, VENDOR_DIR, relative_path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        response = requests.get(url, timeout=30)
+        response.raise_for_status()
+        with open(target, "wb") as f:
+            f.write(response.content)
+        fetched.append(target)
+        
+        for reference in set(CSS_URL.findall(response.text)):
+            if reference.startswith("data:"):
+                continue
+            reference_path = reference.split("?")[0].split("#")[0]
+            asset_target = os.path.normpath(os.path.join(os.path.dirname(target), reference_path))
+            if os.path.exists(asset_target):
+                continue
+            os.makedirs(os.path.dirname(asset_target), exist_ok=True)
+            asset = requests.get(urljoin(url, reference_path), timeout=30)
+            asset.raise_for_status()
+            with open(asset_target, "wb") as f:
+                f.write(asset.content)
+            fetched.append(asset_target)
+    return fetched
+
+def _inline_font_urls(css: str, source_dir: str, dist_dir: str) -> str:
+    """Copy referenced font files into dist with fingerprinted names and rewrite the urls"""
+    def replace(match):
+        reference = match.group(1)
+        if reference.startswith(("data:", "http:", "https:", "/")):
+            return match.group(0)
+        suffix = reference[len(reference.split("?")[0].split("#")[0]):]
+        source = os.path.normpath(os.path.join(source_dir, reference.split("?")[0].split("#")[0]))
+        if not os.path.exists(source):
+            return match.group(0)
+        with open(source, "rb") as f:
+            content = f.read()
+        base, ext = os.path.splitext(os.path.basename(source))
+        name = f"{base}.{_fingerprint(content)}{ext}"
+        shutil.copyfile(source, os.path.join(dist_dir, name))
+        return f"url({name}{suffix})"
+    return CSS_URL.sub(replace, css)
+
+def build_assets(static_dir: str = STATIC_DIR, templates_dir: str = TEMPLATES_DIR) -> Dict[str, str]:
+    """
+    Build the purged, fingerprinted CSS bundle and its precompressed variants
+    
+    Returns:
+        The manifest mapping logical asset names to fingerprinted paths
+    """
+    used = collect_used_tokens(templates_dir)
+    vendor_dir = os.path.join(static_dir, VENDOR_DIR)
+    dist_dir = os.path.join(static_dir, DIST_DIR)
+    if os.path.isdir(dist_dir):
+        shutil.rmtree(dist_dir)
+    os.makedirs(dist_dir)
+    
+    parts = []
+    for relative_path, purge in BUNDLE_SOURCES:
+        source = os.path.normpath(os.path.join(vendor_dir, relative_path))
+        if not os.path.exists(source):
+            raise FileNotFoundError(f"Missing asset source {source}; run build-assets with --fetch first")
+        with open(source, "r", encoding="utf-8") as f:
+            css = f.read()
+        if purge:
+            css = purge_css(css, used)
+        parts.append(_inline_font_urls(css, os.path.dirname(source), dist_dir))
+    
+    content = "\n".join(parts).encode("utf-8")
+    bundle_name = f"app.{_fingerprint(content)}.css"
+    _write_variants(os.path.join(dist_dir, bundle_name), content)
+    
+    manifest = {"app.css": f"{DIST_DIR}/{bundle_name}"}
+    with open(os.path.join(dist_dir, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2)
+    
+    load_manifest.cache_clear()
+    return manifest
+
+@lru_cache(maxsize=1)
+def load_manifest(static_dir: str = STATIC_DIR) -> Dict[str, str]:
+    """Read the asset manifest written by build_assets, if any"""
+    path = os.path.join(static_dir, DIST_DIR, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+def asset_url(name: str) -> Optional[str]:
+    """URL of a built asset, or None when the bundle has not been built"""
+    path = load_manifest().get(name)
+    return f"/static/{path}" if path else None
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles that serves .br/.gz siblings and long-lived caching for fingerprinted files"""
+    
+    ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+    
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        request_headers = Headers(scope=scope)
+        accepted = {value.split(";")[0].strip() for value in request_headers.get("accept-encoding", "").split(",")}
+        full_path = str(full_path)
+        headers = {"vary": "Accept-Encoding"}
+        
+        is_fingerprinted = f"{os.sep}{DIST_DIR}{os.sep}" in full_path
+        headers["cache-control"] = IMMUTABLE_CACHE_CONTROL if is_fingerprinted else DEFAULT_CACHE_CONTROL
+        
+        serve_path, media_type = full_path, None
+        for encoding, suffix in self.ENCODINGS:
+            if encoding in accepted and os.path.exists(full_path + suffix):
+                serve_path = full_path + suffix
+                stat_result = os.stat(serve_path)
+                media_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+                headers["content-encoding"] = encoding
+                break
+        
+        response = FileResponse(serve_path, status_code=status_code, headers=headers, media_type=media_type, stat_result=stat_result)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
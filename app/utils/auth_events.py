@@ -0,0 +1,192 @@
+import logging
+import os
+import threading
+from collections import deque
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import Request
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+from app.database import engine
+from app.models.auth_event import AuthEvent
+from app.utils.client_utils import get_client_ip
+
+logger = logging.getLogger(__name__)
+
+AUTH_EVENTS_ENABLED = os.getenv("AUTH_EVENTS_ENABLED", "true").lower() == "true"
+AUTH_EVENT_BUFFER_SIZE = int(os.getenv("AUTH_EVENT_BUFFER_SIZE", "10000"))
+AUTH_EVENT_BATCH_SIZE = int(os.getenv("AUTH_EVENT_BATCH_SIZE", "500"))
+AUTH_EVENT_FLUSH_SECONDS = float(os.getenv("AUTH_EVENT_FLUSH_SECONDS", "2"))
+
+SIGNUP = "signup"
+LOGIN_SUCCEEDED = "login_succeeded"
+LOGIN_FAILED = "login_failed"
+OAUTH_LOGIN = "oauth_login"
+LOGOUT = "logout"
+EMAIL_VERIFIED = "email_verified"
+PASSWORD_RESET_REQUESTED = "password_reset_requested"
+PASSWORD_RESET = "password_reset"
+
+COLUMNS = ("event_type", "user_id", "email", "ip_address", "user_agent", "detail", "created_at")
+
+class AuthEventBuffer:
+    """
+    Bounded in-memory ring buffer of authentication events
+    
+    Recording is an append under a lock and never touches the database. When
+    the buffer is full the oldest event is overwritten and counted as dropped.
+    A background thread drains it in batches of batch_size.
+    """
+    
+    def __init__(self, max_events: int = 10000, batch_size: int = 500):
+        self.events: deque = deque(maxlen=max_events)
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.recorded = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+    
+    def record(
+        self,
+        event_type: str,
+        request: Optional[Request] = None,
+        user_id: Optional[int] = None,
+        email: Optional[str] = None,
+        detail: Optional[str] = None
+    ):
+        """Queue one event; cheap enough to call inline on every auth request"""
+        ip_address = get_client_ip(request)[:45] if request else None
+        user_agent = request.headers.get("user-agent", "")[:255] if request else None
+        row = (event_type, user_id, email, ip_address, user_agent, detail, datetime.now(timezone.utc))
+        
+        with self.lock:
+            if len(self.events) == self.events.maxlen:
+                self.dropped += 1
+            self.events.append(row)
+            self.recorded += 1
+            full = len(self.events) >= self.batch_size
+        if full:
+            self.wakeup.set()
+    
+    def drain(self, limit: int) -> List[Tuple]:
+        with self.lock:
+            return [self.events.popleft() for _ in range(min(limit, len(self.events)))]
+    
+    def flush(self) -> int:
+        """Write everything buffered so far in batches; failed batches are counted and discarded"""
+        written = 0
+        while True:
+            rows = self.drain(self.batch_size)
+            if not rows:
+                return written
+            try:
+                write_auth_events(rows)
+            except Exception as e:
+                with self.lock:
+                    self.failed += len(rows)
+                logger.warning("Failed to write auth events", extra={"events": len(rows), "error_message": str(e)})
+                return written
+            with self.lock:
+                self.written += len(rows)
+                self.batches += 1
+            written += len(rows)
+    
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "enabled": AUTH_EVENTS_ENABLED,
+                "buffered": len(self.events),
+                "capacity": self.events.maxlen,
+                "recorded": self.recorded,
+                "dropped": self.dropped,
+                "written": self.written,
+                "failed": self.failed,
+                "batches": self.batches
+            }
+
+def write_auth_events(rows: List[Tuple]):
+    """Insert a batch with COPY on PostgreSQL and a multi-row INSERT elsewhere"""
+    with engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            cursor = connection.connection.cursor()
+            with cursor.copy(f"COPY auth_events ({', '.join(COLUMNS)}) FROM STDIN") as copy:
+                for row in rows:
+                    copy.write_row(row)
+        else:
+            connection.execute(insert(AuthEvent), [dict(zip(COLUMNS, row)) for row in rows])
+
+auth_event_buffer = AuthEventBuffer(max_events=AUTH_EVENT_BUFFER_SIZE, batch_size=AUTH_EVENT_BATCH_SIZE)
+
+_writer: Optional[threading.Thread] = None
+_stop = threading.Event()
+
+def record_auth_event(
+    event_type: str,
+    request: Optional[Request] = None,
+    user_id: Optional[int] = None,
+    email: Optional[str] = None,
+    detail: Optional[str] = None
+):
+    """Record an authentication event in this worker's buffer"""
+    if AUTH_EVENTS_ENABLED:
+        auth_event_buffer.record(event_type, request=request, user_id=user_id, email=email, detail=detail)
+
+def _run_writer():
+    while not _stop.is_set():
+        auth_event_buffer.wakeup.wait(AUTH_EVENT_FLUSH_SECONDS)
+        auth_event_buffer.wakeup.clear()
+        auth_event_buffer.flush()
+
+def start_auth_event_writer():
+    """Start the background thread that drains the event buffer on size or time"""
+    global _writer
+    if not AUTH_EVENTS_ENABLED or (_writer and _writer.is_alive()):
+        return
+    _stop.clear()
+    _writer = threading.Thread(target=_run_writer, name="auth-event-writer", daemon=True)
+    _writer.start()
+
+def stop_auth_event_writer():
+    """Stop the writer thread and write whatever is still buffered"""
+    _stop.set()
+    auth_event_buffer.wakeup.set()
+    if _writer:
+        _writer.join(timeout=5)
+    auth_event_buffer.flush()
+
+def auth_event_stats() -> Dict[str, Any]:
+    """Buffer occupancy, drop and write counters for this worker"""
+    return auth_event_buffer.stats()
+
+def _month_start(year: int, month: int) -> date:
+    return date(year + (month - 1) // 12, (month - 1) % 12 + 1, 1)
+
+def ensure_auth_event_partitions(db: Session, months_ahead: int = 2) -> int:
+    """Create missing monthly partitions up to months_ahead; no-op unless auth_events is partitioned"""
+    if db.get_bind().dialect.name != "postgresql":
+        return 0
+    
+    partitioned = db.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = 'auth_events')"
+    )).scalar()
+    if not partitioned:
+        return 0
+    
+    today = date.today()
+    created = 0
+    for offset in range(months_ahead + 1):
+        start = _month_start(today.year, today.month + offset)
+        end = _month_start(today.year, today.month + offset + 1)
+        name = f"auth_events_{start:%Y_%m}"
+        if db.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is None:
+            db.execute(text(
+                f"CREATE TABLE {name} PARTITION OF auth_events "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            ))
+            created += 1
+    db.commit()
+    return created
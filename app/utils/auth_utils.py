@@ -1,19 +1,29 @@
+import logging
 import secrets
 from datetime import datetime, timedelta
 from typing import Optional
-import requests
 import os
 from sqlalchemy.orm import Session
 from app.models.user import User
-from passlib.hash import bcrypt
+from app.utils.tracing import traced
+from app.utils.resilience import mailgun
 
+logger = logging.getLogger(__name__)
+
+def _bcrypt():
+    """Import passlib's bcrypt handler on first use to keep worker start-up light"""
+    from passlib.hash import bcrypt
+    return bcrypt
+
+@traced("bcrypt.hash")
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt"""
-    return bcrypt.hash(password)
+    return _bcrypt().hash(password)
 
+@traced("bcrypt.verify")
 def verify_password(password: str, hashed_password: str) -> bool:
     """Verify a password against its hash using bcrypt"""
-    return bcrypt.verify(password, hashed_password)
+    return _bcrypt().verify(password, hashed_password)
 
 def generate_session_token() -> str:
     """Generate a random session token"""
@@ -27,6 +37,7 @@ def generate_reset_token() -> str:
     """Generate a random password reset token"""
     return secrets.token_urlsafe(16)
 
+@traced("mailgun.send_verification_email", kind="client")
 def send_verification_email(email: str, token: str) -> bool:
     """Send verification email using Mailgun API"""
     try:
@@ -35,7 +46,7 @@ def send_verification_email(email: str, token: str) -> bool:
         from_email = os.getenv("MAILGUN_FROM_EMAIL")
         
         if not all([mailgun_api_key, mailgun_domain, from_email]):
-            print("Mailgun configuration missing")
+            logger.warning("Mailgun configuration missing")
             return False
         
         base_url = os.getenv("DUCKDNS_DOMAIN")
@@ -55,7 +66,8 @@ def send_verification_email(email: str, token: str) -> bool:
         </html>
         """
         
-        response = requests.post(
+        response = mailgun.request(
+            "POST",
             f"https://api.mailgun.net/v3/{mailgun_domain}/messages",
             auth=("api", mailgun_api_key),
             data={
@@ -68,9 +80,10 @@ def send_verification_email(email: str, token: str) -> bool:
         
         return response.status_code == 200
     except Exception as e:
-        print(f"Error sending email: {e}")
+        logger.error("Error sending email", extra={"error_message": str(e)})
         return False
 
+@traced("mailgun.send_password_reset_email", kind="client")
 def send_password_reset_email(email: str, token: str) -> bool:
     """Send password reset email using Mailgun API"""
     try:
@@ -79,7 +92,7 @@ def send_password_reset_email(email: str, token: str) -> bool:
         from_email = os.getenv("MAILGUN_FROM_EMAIL")
         
         if not all([mailgun_api_key, mailgun_domain, from_email]):
-            print("Mailgun configuration missing")
+            logger.warning("Mailgun configuration missing")
             return False
         
         base_url = os.getenv("DUCKDNS_DOMAIN")
@@ -100,7 +113,8 @@ def send_password_reset_email(email: str, token: str) -> bool:
         </html>
         """
         
-        response = requests.post(
+        response = mailgun.request(
+            "POST",
             f"https://api.mailgun.net/v3/{mailgun_domain}/messages",
             auth=("api", mailgun_api_key),
             data={
@@ -113,5 +127,5 @@ def send_password_reset_email(email: str, token: str) -> bool:
         
         return response.status_code == 200
     except Exception as e:
-        print(f"Error sending email: {e}")
+        logger.error("Error sending email", extra={"error_message": str(e)})
         return False 
\ No newline at end of file
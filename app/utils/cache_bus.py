@@ -0,0 +1,187 @@
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+logger = logging.getLogger(__name__)
+
+CACHE_BUS_ENABLED = os.getenv("CACHE_BUS_ENABLED", "true").lower() == "true"
+CACHE_BUS_CHANNEL = os.getenv("CACHE_BUS_CHANNEL", "authenticute_invalidate")
+LOCAL_CACHE_TTL_SECONDS = float(os.getenv("LOCAL_CACHE_TTL_SECONDS", "30"))
+LOCAL_CACHE_MAX_ENTRIES = int(os.getenv("LOCAL_CACHE_MAX_ENTRIES", "10000"))
+
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes or more
+MAX_NOTIFY_PAYLOAD_BYTES = 7900
+
+_handlers: Dict[str, List[Callable[[str], None]]] = {}
+_batch_handlers: Dict[str, List[Callable[[List[str]], None]]] = {}
+_caches: List["LocalCache"] = []
+_listener_connected = False
+
+class LocalCache:
+    """
+    Small thread-safe TTL/LRU cache for per-process lookups
+    
+    Entries are only served while the invalidation listener is connected, so a
+    worker that may have missed messages falls back to the database.
+    """
+    
+    def __init__(self, ttl_seconds: float = 30, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Any, tuple]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        _caches.append(self)
+    
+    def get(self, key) -> Optional[Any]:
+        """Get a cached value if it is fresh and caching is active"""
+        if not _listener_connected or self.ttl_seconds <= 0:
+            return None
+        
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+    
+    def set(self, key, value):
+        """Store a value until it expires or is invalidated"""
+        if not _listener_connected or self.ttl_seconds <= 0:
+            return
+        
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+    
+    def delete(self, key):
+        """Drop a single entry"""
+        with self.lock:
+            self.entries.pop(key, None)
+    
+    def delete_where(self, predicate: Callable[[Any, Any], bool]):
+        """Drop every entry whose key and value match the predicate"""
+        with self.lock:
+            for key in [key for key, (_, value) in self.entries.items() if predicate(key, value)]:
+                del self.entries[key]
+    
+    def clear(self):
+        """Drop all entries"""
+        with self.lock:
+            self.entries.clear()
+
+def token_digest(token: str) -> str:
+    """Short digest used to key and broadcast secrets such as session tokens"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:32]
+
+def snapshot(instance) -> Dict[str, Any]:
+    """Copy the column values of an ORM instance"""
+    return {column.key: getattr(instance, column.key) for column in instance.__table__.columns}
+
+def restore(db: Session, model, values: Dict[str, Any]):
+    """Attach a cached snapshot to the session without issuing a query"""
+    instance = model(**values)
+    make_transient_to_detached(instance)
+    return db.merge(instance, load=False)
+
+def subscribe(kind: str, handler: Callable[[str], None]):
+    """Register a handler for invalidation messages of one kind, called once per key"""
+    _handlers.setdefault(kind, []).append(handler)
+
+def subscribe_batch(kind: str, handler: Callable[[List[str]], None]):
+    """Register a handler that receives all keys of a message at once"""
+    _batch_handlers.setdefault(kind, []).append(handler)
+
+def apply_invalidation(message: str):
+    """Apply an invalidation message of the form 'kind:key[,key...]' to local caches"""
+    kind, _, packed = message.partition(":")
+    keys = packed.split(",")
+    for handler in _handlers.get(kind, []):
+        for key in keys:
+            try:
+                handler(key)
+            except Exception as e:
+                logger.error("Cache invalidation handler failed", extra={"invalidation": f"{kind}:{key}", "error_message": str(e)})
+    for handler in _batch_handlers.get(kind, []):
+        try:
+            handler(keys)
+        except Exception as e:
+            logger.error("Cache invalidation handler failed", extra={"invalidation": kind, "error_message": str(e)})
+
+def _notify(db: Session, message: str):
+    apply_invalidation(message)
+    
+    if CACHE_BUS_ENABLED and db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CACHE_BUS_CHANNEL, "payload": message})
+
+def publish_invalidation(db: Session, kind: str, key) -> None:
+    """
+    Invalidate locally and queue a NOTIFY for every other worker
+    
+    The NOTIFY is part of the caller's transaction and is delivered on commit,
+    so other workers never drop a cache entry before the change is visible.
+    Keys must not contain ','.
+    """
+    _notify(db, f"{kind}:{key}")
+
+def publish_invalidations(db: Session, kind: str, keys: Iterable) -> None:
+    """Invalidate many keys of one kind with as few NOTIFYs as the payload limit allows"""
+    prefix = f"{kind}:"
+    packed: List[str] = []
+    size = len(prefix)
+    for key in map(str, keys):
+        if packed and size + len(key) + 1 > MAX_NOTIFY_PAYLOAD_BYTES:
+            _notify(db, prefix + ",".join(packed))
+            packed, size = [], len(prefix)
+        packed.append(key)
+        size += len(key) + 1
+    if packed:
+        _notify(db, prefix + ",".join(packed))
+
+def _set_listener_connected(connected: bool):
+    """Track listener state; any gap may have lost messages, so caches are cleared"""
+    global _listener_connected
+    _listener_connected = connected
+    for cache in _caches:
+        cache.clear()
+
+async def run_invalidation_listener():
+    """LISTEN for invalidation messages and apply them until cancelled, reconnecting on failure"""
+    from app.database import engine, libpq_url
+    if not CACHE_BUS_ENABLED or engine.dialect.name != "postgresql":
+        return
+    
+    import psycopg
+    
+    backoff = 1
+    while True:
+        try:
+            async with await psycopg.AsyncConnection.connect(libpq_url(), autocommit=True) as conn:
+                await conn.execute(f'LISTEN "{CACHE_BUS_CHANNEL}"')
+                _set_listener_connected(True)
+                backoff = 1
+                async for notify in conn.notifies():
+                    apply_invalidation(notify.payload)
+        except asyncio.CancelledError:
+            _set_listener_connected(False)
+            raise
+        except Exception as e:
+            logger.warning("Cache invalidation listener disconnected", extra={"error_message": str(e)})
+        
+        _set_listener_connected(False)
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, 30)
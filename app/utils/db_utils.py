@@ -1,14 +1,38 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import bindparam, delete, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 from app.models import User
-from typing import Optional
+from app.utils.token_utils import issue_verification_token
+from app.utils.cache_bus import LocalCache, LOCAL_CACHE_TTL_SECONDS, LOCAL_CACHE_MAX_ENTRIES, publish_invalidation, publish_invalidations, restore, snapshot, subscribe
+from app.utils.session_store import session_store
+from app.utils.single_flight import coalesced_load
+from typing import Callable, List, Optional, Tuple
+
+USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
 
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
     """Get user by email address"""
-    return db.query(User).filter(User.email == email).first()
+    return db.execute(USER_BY_EMAIL, {"email": email}).scalar_one_or_none()
+
+user_cache = LocalCache(ttl_seconds=LOCAL_CACHE_TTL_SECONDS, max_entries=LOCAL_CACHE_MAX_ENTRIES)
+subscribe("user", lambda key: user_cache.delete(int(key)))
+subscribe("users_deleted", lambda key: user_cache.delete(int(key)))
 
 def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
-    """Get user by ID"""
-    return db.query(User).filter(User.id == user_id).first()
+    """Get user by ID, served from the local cache or a concurrent identical lookup when possible"""
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return restore(db, User, cached)
+    
+    def load():
+        user = db.execute(USER_BY_ID, {"user_id": user_id}).scalar_one_or_none()
+        if user:
+            user_cache.set(user_id, snapshot(user))
+        return user
+    
+    return coalesced_load(db, "user_by_id", user_id, User, load)
 
 def create_user(
     db: Session, 
@@ -35,31 +59,141 @@ def create_user(
     db.refresh(user)
     return user
 
+def dialect_insert(db: Session, model):
+    """Build an INSERT for the session's dialect so ON CONFLICT clauses are available"""
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite.insert(model)
+    return postgresql.insert(model)
+
+def create_user_with_verification_token(
+    db: Session,
+    email: str,
+    hashed_password: str,
+    name: str = None
+) -> Optional[Tuple[int, str]]:
+    """
+    Create a user and its email verification token in one transaction
+    
+    The insert uses ON CONFLICT (email) DO NOTHING, so an already registered
+    email (including one inserted by a concurrent signup) is reported by
+    returning None instead of raising IntegrityError.
+    
+    Returns:
+        (user_id, verification token) or None if the email is taken
+    """
+    user_id = db.execute(
+        dialect_insert(db, User)
+        .values(email=email, hashed_password=hashed_password, name=name)
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User.id)
+    ).scalar_one_or_none()
+    
+    if user_id is None:
+        db.rollback()
+        return None
+    
+    verification_token = issue_verification_token(db, user_id, commit=False, reuse_window_minutes=0)
+    db.commit()
+    return user_id, verification_token
+
 def update_user(db: Session, user_id: int, **kwargs) -> Optional[User]:
-    """Update user information"""
-    user = get_user_by_id(db, user_id)
+    """Update user information with a single UPDATE ... RETURNING"""
+    values = {key: value for key, value in kwargs.items() if key in User.__table__.columns}
+    if not values:
+        return get_user_by_id(db, user_id)
+    
+    user = db.scalars(
+        update(User)
+        .where(User.id == user_id)
+        .values(**values)
+        .returning(User)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    ).first()
+    
     if user:
-        for key, value in kwargs.items():
-            if hasattr(user, key):
-                setattr(user, key, value)
-        db.commit()
-        db.refresh(user)
+        # Detach so the commit does not expire the freshly returned row
+        db.expunge(user)
+        publish_invalidation(db, "user", user_id)
+    db.commit()
     return user
 
+def _forget_users(db: Session, user_ids: List[int]):
+    """Invalidate cached users and their sessions; drop sessions kept outside the database"""
+    if not session_store.cascades_with_users:
+        for user_id in user_ids:
+            session_store.delete_user(db, user_id)
+    publish_invalidations(db, "users_deleted", user_ids)
+
 def delete_user(db: Session, user_id: int) -> bool:
-    """Delete a user"""
-    user = get_user_by_id(db, user_id)
-    if user:
-        db.delete(user)
-        db.commit()
-        return True
-    return False
+    """Delete a user; sessions and tokens go with it through ON DELETE CASCADE"""
+    deleted = db.execute(
+        delete(User).where(User.id == user_id).returning(User.id)
+    ).scalar_one_or_none()
+    if deleted is None:
+        db.rollback()
+        return False
+    _forget_users(db, [user_id])
+    db.commit()
+    return True
+
+def _purge_filter(unverified_older_than_days: Optional[int], user_ids: Optional[List[int]]):
+    conditions = []
+    if unverified_older_than_days is not None:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=unverified_older_than_days)
+        conditions.append(or_(User.is_verified == False, User.is_verified.is_(None)))
+        conditions.append(User.created_at < cutoff)
+    if user_ids is not None:
+        conditions.append(User.id.in_(user_ids))
+    if not conditions:
+        raise ValueError("At least one purge criterion is required")
+    return conditions
+
+def purge_users(
+    db: Session,
+    unverified_older_than_days: Optional[int] = None,
+    user_ids: Optional[List[int]] = None,
+    batch_size: int = 500,
+    dry_run: bool = False,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> int:
+    """
+    Delete every user matching all given criteria in batches of batch_size
+    
+    Each batch is one DELETE ... WHERE id IN (...) committed on its own, so
+    locks stay short and an interrupted purge keeps the work already done.
+    Child rows are removed by the database through ON DELETE CASCADE.
+    """
+    conditions = _purge_filter(unverified_older_than_days, user_ids)
+    total = 0
+    last_id = 0
+    
+    while True:
+        batch = db.execute(
+            select(User.id).where(*conditions, User.id > last_id).order_by(User.id).limit(batch_size)
+        ).scalars().all()
+        if not batch:
+            break
+        last_id = batch[-1]
+        
+        if not dry_run:
+            db.execute(delete(User).where(User.id.in_(batch)).execution_options(synchronize_session=False))
+            _forget_users(db, batch)
+            db.commit()
+        
+        total += len(batch)
+        if progress:
+            progress(total, last_id)
+    
+    return total
 
 def verify_user_email(db: Session, user_id: int) -> bool:
     """Mark user email as verified"""
-    user = get_user_by_id(db, user_id)
-    if user:
-        user.is_verified = True
-        db.commit()
-        return True
-    return False 
\ No newline at end of file
+    result = db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(is_verified=True)
+        .execution_options(synchronize_session=False)
+    )
+    publish_invalidation(db, "user", user_id)
+    db.commit()
+    return result.rowcount > 0 
\ No newline at end of file
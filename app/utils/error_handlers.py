@@ -3,7 +3,6 @@ from typing import Dict, Any, Optional
 from fastapi import HTTPException, status
 from fastapi.responses import JSONResponse
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class AuthentiCuteException(Exception):
@@ -99,20 +98,21 @@ def log_error(error: Exception, context: Dict[str, Any] = None):
         error: The exception that occurred
         context: Additional context information
     """
-    error_info = {
-        "error_type": type(error).__name__,
-        "error_message": str(error),
-        "context": context or {}
-    }
-    
-    logger.error(f"Application error: {error_info}")
+    logger.error(
+        "Application error",
+        extra={
+            "error_type": type(error).__name__,
+            "error_message": str(error),
+            "context": context or {}
+        }
+    )
     
     if isinstance(error, DatabaseError):
-        logger.error(f"Database error: {error.details}")
+        logger.error("Database error", extra={"details": error.details})
     elif isinstance(error, EmailError):
-        logger.error(f"Email error: {error.details}")
+        logger.error("Email error", extra={"details": error.details})
     elif isinstance(error, RateLimitError):
-        logger.warning(f"Rate limit exceeded: {error.details}")
+        logger.warning("Rate limit exceeded", extra={"details": error.details})
 
 def handle_unexpected_error(error: Exception, request_info: Dict[str, Any] = None):
     """
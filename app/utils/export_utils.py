@@ -0,0 +1,153 @@
+import csv
+import gzip
+import io
+import json
+import os
+import zlib
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.database import SessionLocal
+from app.models.user import User
+
+EXPORT_COLUMNS = [column for column in User.__table__.columns if column.name != "hashed_password"]
+EXPORT_FIELDS = [column.name for column in EXPORT_COLUMNS]
+EXPORT_FORMATS = ("ndjson", "csv")
+
+def iter_user_batches(db: Session, after_id: int = 0, batch_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+    """Yield batches of exportable user rows in id order using a server-side cursor"""
+    stmt = (
+        select(*EXPORT_COLUMNS)
+        .where(User.id > after_id)
+        .order_by(User.id)
+        .execution_options(yield_per=batch_size)
+    )
+    result = db.execute(stmt)
+    for partition in result.mappings().partitions():
+        yield [_serialize_row(row) for row in partition]
+
+def _serialize_row(row) -> Dict[str, Any]:
+    """Convert a result row into JSON/CSV friendly values"""
+    data = {}
+    for key in EXPORT_FIELDS:
+        value = row[key]
+        data[key] = value.isoformat() if isinstance(value, datetime) else value
+    return data
+
+def format_rows(rows: List[Dict[str, Any]], fmt: str, include_header: bool = False) -> bytes:
+    """Encode a batch of rows as NDJSON or CSV"""
+    if fmt == "ndjson":
+        return "".join(json.dumps(row, separators=(",", ":")) + "\n" for row in rows).encode("utf-8")
+    
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    if include_header:
+        writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+def _load_checkpoint(checkpoint_path: str) -> Optional[Dict[str, Any]]:
+    """Read an export checkpoint if one exists"""
+    if not checkpoint_path or not os.path.exists(checkpoint_path):
+        return None
+    with open(checkpoint_path, "r") as f:
+        return json.load(f)
+
+def _save_checkpoint(checkpoint_path: str, checkpoint: Dict[str, Any]):
+    """Atomically persist an export checkpoint"""
+    tmp_path = f"{checkpoint_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, checkpoint_path)
+
+def export_users(
+    db: Session,
+    output_path: str,
+    fmt: str = "ndjson",
+    compress: bool = False,
+    batch_size: int = 1000,
+    checkpoint_path: str = None,
+    progress: Callable[[int, int], None] = None
+) -> int:
+    """
+    Export users to a file, resuming from a keyset checkpoint if one matches
+    
+    Every batch is written (as its own gzip member when compressing) and flushed
+    before the checkpoint records the last exported id and the file offset, so an
+    interrupted export is truncated back to the last complete batch on resume.
+    
+    Returns:
+        Total number of rows in the export
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    
+    checkpoint = _load_checkpoint(checkpoint_path)
+    if checkpoint and (checkpoint.get("output") != output_path
+                       or checkpoint.get("format") != fmt
+                       or checkpoint.get("compress") != compress):
+        checkpoint = None
+    
+    if checkpoint:
+        last_id, offset, total = checkpoint["last_id"], checkpoint["offset"], checkpoint["rows"]
+    else:
+        last_id, offset, total = 0, 0, 0
+    
+    mode = "r+b" if checkpoint and os.path.exists(output_path) else "wb"
+    with open(output_path, mode) as f:
+        f.seek(offset)
+        f.truncate()
+        
+        for rows in iter_user_batches(db, after_id=last_id, batch_size=batch_size):
+            payload = format_rows(rows, fmt, include_header=(fmt == "csv" and total == 0))
+            if compress:
+                payload = gzip.compress(payload)
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+            
+            last_id = rows[-1]["id"]
+            total += len(rows)
+            if checkpoint_path:
+                _save_checkpoint(checkpoint_path, {
+                    "output": output_path,
+                    "format": fmt,
+                    "compress": compress,
+                    "last_id": last_id,
+                    "offset": f.tell(),
+                    "rows": total
+                })
+            if progress:
+                progress(total, last_id)
+    
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    
+    return total
+
+def stream_users(fmt: str = "ndjson", compress: bool = False, after_id: int = 0, batch_size: int = 1000) -> Iterator[bytes]:
+    """
+    Stream an export as encoded chunks for an HTTP response
+    
+    Uses its own database session because the response body is produced after
+    request dependencies have been closed.
+    """
+    db = SessionLocal()
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    try:
+        first = True
+        for rows in iter_user_batches(db, after_id=after_id, batch_size=batch_size):
+            payload = format_rows(rows, fmt, include_header=(fmt == "csv" and first and after_id == 0))
+            first = False
+            if compressor:
+                payload = compressor.compress(payload)
+                if not payload:
+                    continue
+            yield payload
+        if compressor:
+            yield compressor.flush()
+    finally:
+        db.close()
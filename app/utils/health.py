@@ -0,0 +1,105 @@
+import asyncio
+import os
+import time
+from typing import Any, Dict, Tuple
+from sqlalchemy import text
+from app.database import engine, probe_engine
+from app.utils.startup_utils import startup_state
+from app.utils.resilience import google_oauth, mailgun
+
+HEALTH_PROBE_INTERVAL_SECONDS = float(os.getenv("HEALTH_PROBE_INTERVAL_SECONDS", "5"))
+HEALTH_MAX_LOOP_LAG_MS = float(os.getenv("HEALTH_MAX_LOOP_LAG_MS", "1000"))
+HEALTH_MAX_POOL_SATURATION = float(os.getenv("HEALTH_MAX_POOL_SATURATION", "1.0"))
+
+health_state: Dict[str, Any] = {
+    "heartbeat_at": None,
+    "checked_at": None,
+    "database": {"ok": False, "latency_ms": None, "error": "not checked yet"},
+    "pool": {},
+    "event_loop": {"lag_ms": 0.0},
+    "dependencies": {}
+}
+
+def check_database() -> Dict[str, Any]:
+    """Run SELECT 1 on the probe engine's connection and time it"""
+    start = time.perf_counter()
+    try:
+        with probe_engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        return {"ok": True, "latency_ms": round((time.perf_counter() - start) * 1000, 2), "error": None}
+    except Exception as e:
+        return {"ok": False, "latency_ms": None, "error": str(e)}
+
+def pool_status() -> Dict[str, Any]:
+    """Checked-out connections relative to the pool's capacity"""
+    pool = engine.pool
+    if not hasattr(pool, "checkedout") or not hasattr(pool, "size"):
+        return {"type": type(pool).__name__}
+    
+    capacity = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+    checked_out = pool.checkedout()
+    return {
+        "type": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": checked_out,
+        "overflow": pool.overflow(),
+        "saturation": round(checked_out / capacity, 3) if capacity else 0.0
+    }
+
+def dependency_status() -> Dict[str, Any]:
+    """Configuration and circuit breaker state of outbound dependencies"""
+    return {
+        "mailgun": {
+            "configured": bool(os.getenv("MAILGUN_API_KEY") and os.getenv("MAILGUN_DOMAIN")),
+            "circuit": mailgun.breaker.state
+        },
+        "google_oauth": {
+            "configured": bool(os.getenv("GOOGLE_CLIENT_ID") and os.getenv("GOOGLE_CLIENT_SECRET")),
+            "circuit": google_oauth.breaker.state
+        }
+    }
+
+async def run_health_prober(interval: float = HEALTH_PROBE_INTERVAL_SECONDS):
+    """
+    Refresh the cached health state in the background so probes are answered from memory
+    
+    The heartbeat is stamped before the database check, so a slow database can
+    only make the worker unready, never look stalled.
+    """
+    while True:
+        health_state["heartbeat_at"] = time.monotonic()
+        health_state["database"] = await asyncio.to_thread(check_database)
+        health_state["pool"] = pool_status()
+        health_state["dependencies"] = dependency_status()
+        health_state["checked_at"] = time.monotonic()
+        
+        expected = time.monotonic() + interval
+        await asyncio.sleep(interval)
+        health_state["event_loop"] = {"lag_ms": round(max(0.0, time.monotonic() - expected) * 1000, 2)}
+
+def _is_stale(key: str) -> bool:
+    stamped_at = health_state[key]
+    return stamped_at is None or time.monotonic() - stamped_at > 3 * HEALTH_PROBE_INTERVAL_SECONDS + 5
+
+def liveness() -> Tuple[bool, Dict[str, Any]]:
+    """Alive while the event loop keeps the prober's heartbeat going; the database has no say"""
+    alive = not (startup_state["ready"] and _is_stale("heartbeat_at"))
+    return alive, {"status": "alive" if alive else "stalled", "event_loop": health_state["event_loop"]}
+
+def readiness() -> Tuple[bool, Dict[str, Any]]:
+    """Ready when warmed up, the database answers, and the pool and event loop have headroom"""
+    checks = {
+        "warmed_up": startup_state["ready"],
+        "database": health_state["database"]["ok"] and not _is_stale("checked_at"),
+        "pool": health_state["pool"].get("saturation", 0.0) < HEALTH_MAX_POOL_SATURATION,
+        "event_loop": health_state["event_loop"]["lag_ms"] < HEALTH_MAX_LOOP_LAG_MS
+    }
+    ready = all(checks.values())
+    return ready, {
+        "status": "ready" if ready else "not_ready",
+        "checks": checks,
+        "database": health_state["database"],
+        "pool": health_state["pool"],
+        "event_loop": health_state["event_loop"],
+        "dependencies": health_state["dependencies"]
+    }
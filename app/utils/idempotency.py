@@ -0,0 +1,264 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+IDEMPOTENT_PATHS = (
+    "/api/auth/signup",
+    "/api/auth/login",
+    "/api/auth/forgot-password"
+)
+IDEMPOTENCY_HEADER = b"idempotency-key"
+REPLAYED_HEADER = (b"idempotent-replayed", b"true")
+MAX_KEY_LENGTH = 255
+
+IDEMPOTENCY_ENABLED = os.getenv("IDEMPOTENCY_ENABLED", "true").lower() == "true"
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "600"))
+IDEMPOTENCY_MAX_ENTRIES = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000"))
+IDEMPOTENCY_MAX_RESPONSE_BYTES = int(os.getenv("IDEMPOTENCY_MAX_RESPONSE_BYTES", "65536"))
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "10"))
+
+class IdempotencyEntry:
+    """The first request seen for a key: in flight until done is set, then its stored response"""
+    
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.done = asyncio.Event()
+        self.expires_at = float("inf")
+        self.status: Optional[int] = None
+        self.headers: List[Tuple[bytes, bytes]] = []
+        self.body = b""
+    
+    @property
+    def stored(self) -> bool:
+        return self.status is not None
+
+class IdempotencyStore:
+    """
+    Short-TTL, bounded store of first responses per idempotency key
+    
+    Requests still in flight live in their own dict and are never evicted; they
+    move to the ordered store when their response is kept, or are dropped by
+    their owner when it must not be replayed. Stored entries are therefore in
+    completion order, with expired and overflow entries always at the front.
+    """
+    
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Tuple[str, str], IdempotencyEntry]" = OrderedDict()
+        self.in_flight: Dict[Tuple[str, str], IdempotencyEntry] = {}
+        self.counters = {"executed": 0, "replayed": 0, "waited": 0, "mismatched": 0, "wait_timeouts": 0, "not_stored": 0}
+    
+    def _prune(self):
+        now = time.monotonic()
+        while self.entries:
+            store_key, entry = next(iter(self.entries.items()))
+            if entry.expires_at > now and len(self.entries) <= self.max_entries:
+                break
+            del self.entries[store_key]
+    
+    def get(self, store_key: Tuple[str, str]) -> Optional[IdempotencyEntry]:
+        entry = self.in_flight.get(store_key)
+        if entry is not None:
+            return entry
+        entry = self.entries.get(store_key)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            del self.entries[store_key]
+            return None
+        return entry
+    
+    def begin(self, store_key: Tuple[str, str], fingerprint: str) -> IdempotencyEntry:
+        self._prune()
+        entry = IdempotencyEntry(fingerprint)
+        self.in_flight[store_key] = entry
+        return entry
+    
+    def complete(self, store_key: Tuple[str, str], entry: IdempotencyEntry):
+        """Keep the captured response for replays"""
+        entry.expires_at = time.monotonic() + self.ttl
+        if self.in_flight.get(store_key) is entry:
+            del self.in_flight[store_key]
+        self.entries.pop(store_key, None)
+        self.entries[store_key] = entry
+        entry.done.set()
+        self._prune()
+    
+    def abandon(self, store_key: Tuple[str, str], entry: IdempotencyEntry):
+        """Forget an attempt whose response must not be replayed so the next retry runs the handler"""
+        if self.in_flight.get(store_key) is entry:
+            del self.in_flight[store_key]
+        self.counters["not_stored"] += 1
+        entry.done.set()
+    
+    def stats(self) -> Dict:
+        return {
+            "entries": len(self.entries),
+            "in_flight": len(self.in_flight),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            **self.counters
+        }
+
+idempotency_store = IdempotencyStore(IDEMPOTENCY_TTL_SECONDS, IDEMPOTENCY_MAX_ENTRIES)
+
+def is_storable(status: int) -> bool:
+    """Server errors and throttling are transient, so a retry should run the handler again"""
+    return status < 500 and status != 429
+
+class IdempotencyMiddleware:
+    """
+    ASGI middleware that makes retried auth POSTs carrying an Idempotency-Key safe
+    
+    The first request for a key runs the handler and its response is kept for
+    IDEMPOTENCY_TTL_SECONDS; retries with the same key and body get that response
+    back (marked Idempotent-Replayed) without running the handler again, and
+    duplicates arriving while the original is still running wait for it. Reusing
+    a key with a different body is rejected. The store is per worker, like the
+    other in-process caches.
+    """
+    
+    def __init__(self, app: ASGIApp, store: IdempotencyStore = idempotency_store):
+        self.app = app
+        self.store = store
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (
+            not IDEMPOTENCY_ENABLED
+            or scope["type"] != "http"
+            or scope["method"] != "POST"
+            or scope["path"] not in IDEMPOTENT_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+        
+        key = None
+        for name, value in scope["headers"]:
+            if name == IDEMPOTENCY_HEADER:
+                key = value.decode("latin-1").strip()
+                break
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH or not key.isprintable():
+            await self._error(send, 400, "Idempotency-Key must be 1-255 printable characters.", "INVALID_IDEMPOTENCY_KEY")
+            return
+        
+        body, receive = await self._buffer_body(receive)
+        fingerprint = hashlib.sha256(body).hexdigest()
+        store_key = (scope["path"], key)
+        
+        while True:
+            entry = self.store.get(store_key)
+            if entry is None:
+                await self._execute(scope, receive, send, store_key, fingerprint)
+                return
+            
+            if entry.fingerprint != fingerprint:
+                self.store.counters["mismatched"] += 1
+                await self._error(send, 422, "Idempotency-Key was already used with a different request body.", "IDEMPOTENCY_KEY_REUSED")
+                return
+            
+            if not entry.done.is_set():
+                self.store.counters["waited"] += 1
+                try:
+                    await asyncio.wait_for(entry.done.wait(), IDEMPOTENCY_WAIT_SECONDS)
+                except asyncio.TimeoutError:
+                    self.store.counters["wait_timeouts"] += 1
+                    await self._error(send, 409, "A request with this Idempotency-Key is still in progress.", "IDEMPOTENCY_KEY_IN_PROGRESS", retry_after=1)
+                    return
+            
+            if entry.stored:
+                self.store.counters["replayed"] += 1
+                await self._replay(send, entry)
+                return
+            # The original ended without a replayable response; go around and run it ourselves
+    
+    async def _buffer_body(self, receive: Receive) -> Tuple[bytes, Receive]:
+        """Read the whole request body up front so it can be fingerprinted, then hand it on unchanged"""
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+        delivered = False
+        
+        async def replay_receive() -> Message:
+            nonlocal delivered
+            if not delivered:
+                delivered = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+        
+        return body, replay_receive
+    
+    async def _execute(self, scope: Scope, receive: Receive, send: Send, store_key: Tuple[str, str], fingerprint: str):
+        entry = self.store.begin(store_key, fingerprint)
+        self.store.counters["executed"] += 1
+        status = None
+        headers: List[Tuple[bytes, bytes]] = []
+        chunks = []
+        size = 0
+        complete = False
+        
+        async def capture_send(message: Message):
+            nonlocal status, headers, size, complete
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunk = message.get("body", b"")
+                size += len(chunk)
+                if size <= IDEMPOTENCY_MAX_RESPONSE_BYTES:
+                    chunks.append(chunk)
+                if not message.get("more_body", False):
+                    complete = True
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, capture_send)
+        finally:
+            if complete and is_storable(status) and size <= IDEMPOTENCY_MAX_RESPONSE_BYTES:
+                entry.status = status
+                entry.headers = headers
+                entry.body = b"".join(chunks)
+                self.store.complete(store_key, entry)
+            else:
+                self.store.abandon(store_key, entry)
+    
+    async def _replay(self, send: Send, entry: IdempotencyEntry):
+        await send({
+            "type": "http.response.start",
+            "status": entry.status,
+            "headers": entry.headers + [REPLAYED_HEADER]
+        })
+        await send({"type": "http.response.body", "body": entry.body})
+    
+    async def _error(self, send: Send, status: int, message: str, code: str, retry_after: Optional[int] = None):
+        body = json.dumps({
+            "detail": {
+                "error": {
+                    "message": message,
+                    "code": code
+                }
+            }
+        }).encode("utf-8")
+        headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode())
+        ]
+        if retry_after is not None:
+            headers.append((b"retry-after", str(retry_after).encode()))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+def idempotency_stats() -> Dict:
+    return idempotency_store.stats()
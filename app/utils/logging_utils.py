@@ -0,0 +1,184 @@
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, Tuple
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_RATE_BURST = int(os.getenv("LOG_RATE_BURST", "20"))
+LOG_RATE_WINDOW_SECONDS = float(os.getenv("LOG_RATE_WINDOW_SECONDS", "10"))
+LOG_SAMPLE_EVERY = int(os.getenv("LOG_SAMPLE_EVERY", "100"))
+LOG_RATE_MIN_LEVEL = os.getenv("LOG_RATE_MIN_LEVEL", "WARNING").upper()
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+_STANDARD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id", "suppressed"}
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; extra= fields are emitted as top-level keys"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None)
+        }
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if getattr(record, "suppressed", 0):
+            payload["suppressed"] = record.suppressed
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+class RateLimitFilter(logging.Filter):
+    """
+    Rate-limit repetitive records per (logger, level, message template)
+    
+    Each key may log LOG_RATE_BURST records per window; beyond that only one in
+    LOG_SAMPLE_EVERY passes, carrying the number of records suppressed since the
+    previous one that got through. Only records at LOG_RATE_MIN_LEVEL and above
+    are limited: the point is to tame error storms, while request logs such as
+    uvicorn.access share one template for every request and must all pass.
+    """
+    
+    def __init__(
+        self,
+        burst: int = LOG_RATE_BURST,
+        window_seconds: float = LOG_RATE_WINDOW_SECONDS,
+        sample_every: int = LOG_SAMPLE_EVERY,
+        min_level: int = logging.getLevelName(LOG_RATE_MIN_LEVEL)
+    ):
+        super().__init__()
+        self.min_level = min_level
+        self.burst = burst
+        self.window_seconds = window_seconds
+        self.sample_every = max(1, sample_every)
+        self.lock = threading.Lock()
+        self.windows: Dict[Tuple[str, int, str], list] = {}
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.min_level:
+            return True
+        
+        key = (record.name, record.levelno, str(record.msg))
+        now = time.monotonic()
+        with self.lock:
+            window = self.windows.get(key)
+            if window is None or now - window[0] >= self.window_seconds:
+                if len(self.windows) > 10000:
+                    self.windows.clear()
+                suppressed = window[2] if window else 0
+                self.windows[key] = [now, 1, 0]
+                record.suppressed = suppressed
+                return True
+            
+            window[1] += 1
+            if window[1] <= self.burst or window[1] % self.sample_every == 0:
+                record.suppressed = window[2]
+                window[2] = 0
+                return True
+            window[2] += 1
+            return False
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks the caller and counts records dropped when the queue is full"""
+    
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting happens on the listener thread; only capture request context here
+        record.request_id = request_id_var.get()
+        return record
+    
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[NonBlockingQueueHandler] = None
+
+def configure_logging() -> None:
+    """Route all logging through a bounded queue drained by a background thread"""
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+    
+    output = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(name)s] [%(request_id)s] %(message)s"))
+    
+    _queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+    _queue_handler.addFilter(RateLimitFilter())
+    
+    root = logging.getLogger()
+    root.handlers = [_queue_handler]
+    root.setLevel(LOG_LEVEL)
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        logging.getLogger(name).handlers = []
+        logging.getLogger(name).propagate = True
+    
+    _listener = QueueListener(_queue_handler.queue, output, respect_handler_level=True)
+    _listener.start()
+
+def shutdown_logging() -> None:
+    """Drain the queue and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def logging_stats() -> Dict[str, int]:
+    return {
+        "queued": _queue_handler.queue.qsize() if _queue_handler else 0,
+        "dropped": _queue_handler.dropped if _queue_handler else 0
+    }
+
+class RequestIdMiddleware:
+    """Attach a request id (from X-Request-ID or generated) to log records and the response"""
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:128]
+                break
+        request_id = request_id or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+        
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
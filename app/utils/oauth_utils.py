@@ -1,13 +1,16 @@
+import functools
+import logging
 import os
-import requests
 from typing import Optional, Dict, Any
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
-from google_auth_oauthlib.flow import Flow
 from sqlalchemy.orm import Session
 from app.utils.db_utils import get_user_by_email, create_user
+from app.utils.cache_bus import publish_invalidation
+from app.utils.tracing import start_span
+from app.utils.resilience import google_oauth
 from app.models.user import User
 
+logger = logging.getLogger(__name__)
+
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
 GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
 GOOGLE_REDIRECT_URI = os.getenv("GOOGLE_REDIRECT_URI")
@@ -19,6 +22,8 @@ GOOGLE_SCOPES = [
 
 def get_google_oauth_url() -> str:
     """Generate Google OAuth URL for login"""
+    from google_auth_oauthlib.flow import Flow
+    
     flow = Flow.from_client_config(
         {
             "web": {
@@ -42,12 +47,17 @@ def get_google_oauth_url() -> str:
 
 def verify_google_token(token: str) -> Optional[Dict[str, Any]]:
     """Verify Google ID token and return user info"""
+    from google.oauth2 import id_token
+    from google.auth.exceptions import TransportError
+    from google.auth.transport import requests as google_requests
+    
     try:
-        idinfo = id_token.verify_oauth2_token(
-            token, 
-            google_requests.Request(), 
-            GOOGLE_CLIENT_ID
-        )
+        with google_oauth.guard(failure_types=(TransportError,)):
+            idinfo = id_token.verify_oauth2_token(
+                token, 
+                functools.partial(google_requests.Request(), timeout=google_oauth.timeout), 
+                GOOGLE_CLIENT_ID
+            )
         
         if idinfo['iss'] not in ['accounts.google.com', 'https://accounts.google.com']:
             raise ValueError('Wrong issuer.')
@@ -60,6 +70,7 @@ def verify_google_token(token: str) -> Optional[Dict[str, Any]]:
             'email_verified': idinfo.get('email_verified', False)
         }
     except Exception as e:
+        logger.info("Google ID token rejected", extra={"error_message": str(e)})
         return None
 
 def get_or_create_google_user(db: Session, google_user_info: Dict[str, Any]) -> User:
@@ -78,6 +89,7 @@ def get_or_create_google_user(db: Session, google_user_info: Dict[str, Any]) ->
         existing_user.oauth_id = google_user_info['sub']
         existing_user.oauth_email = google_user_info['email']
         existing_user.is_verified = True
+        publish_invalidation(db, "user", existing_user.id)
         db.commit()
         return existing_user
     
@@ -106,7 +118,10 @@ def handle_google_callback(db: Session, authorization_code: str) -> Optional[Use
             'redirect_uri': GOOGLE_REDIRECT_URI
         }
         
-        token_response = requests.post(token_url, data=token_data)
+        with start_span("google.token_exchange", kind="client", **{"http.url": token_url}) as span:
+            token_response = google_oauth.request("POST", token_url, data=token_data)
+            if span:
+                span.set_attribute("http.status_code", token_response.status_code)
         
         if token_response.status_code != 200:
             return None
@@ -120,7 +135,10 @@ def handle_google_callback(db: Session, authorization_code: str) -> Optional[Use
         userinfo_url = "https://www.googleapis.com/oauth2/v2/userinfo"
         headers = {'Authorization': f'Bearer {access_token}'}
         
-        userinfo_response = requests.get(userinfo_url, headers=headers)
+        with start_span("google.userinfo", kind="client", **{"http.url": userinfo_url}) as span:
+            userinfo_response = google_oauth.request("GET", userinfo_url, headers=headers)
+            if span:
+                span.set_attribute("http.status_code", userinfo_response.status_code)
         
         if userinfo_response.status_code != 200:
             return None
@@ -142,4 +160,5 @@ def handle_google_callback(db: Session, authorization_code: str) -> Optional[Use
         return user
         
     except Exception as e:
+        logger.warning("Google OAuth callback failed", extra={"error_message": str(e)})
         return None 
\ No newline at end of file
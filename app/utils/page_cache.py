@@ -0,0 +1,88 @@
+import gzip
+import hashlib
+import os
+from typing import Dict, Optional
+from fastapi import Request
+from fastapi.responses import Response
+from fastapi.templating import Jinja2Templates
+
+PAGE_CACHE_AUTO_RELOAD = os.getenv("PAGE_CACHE_AUTO_RELOAD", "false").lower() == "true"
+PAGE_CACHE_CONTROL = "no-cache"
+
+class CachedPage:
+    """Rendered HTML with its precompressed variants and ETag"""
+    
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+        self.variants: Dict[str, bytes] = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+        try:
+            import brotli
+            self.variants["br"] = brotli.compress(body, quality=11)
+        except ImportError:
+            pass
+
+class PageCache:
+    """
+    Pre-rendered cache for template pages whose output does not depend on the request
+    
+    Pages are rendered once (at startup or on first use) and served as bytes with
+    ETag revalidation. With auto_reload enabled the cache is rebuilt whenever a
+    template or the asset manifest changes on disk, which is useful in development.
+    """
+    
+    def __init__(self, templates: Jinja2Templates, watch_dirs=("templates", "static/dist"), auto_reload: bool = PAGE_CACHE_AUTO_RELOAD):
+        self.templates = templates
+        self.watch_dirs = watch_dirs
+        self.auto_reload = auto_reload
+        self.pages: Dict[str, CachedPage] = {}
+        self.snapshot: Optional[float] = None
+    
+    def _latest_mtime(self) -> float:
+        latest = 0.0
+        for directory in self.watch_dirs:
+            for root, _, files in os.walk(directory):
+                for name in files:
+                    latest = max(latest, os.path.getmtime(os.path.join(root, name)))
+        return latest
+    
+    def render(self, template_name: str) -> CachedPage:
+        """Render a template into the cache"""
+        body = self.templates.env.get_template(template_name).render().encode("utf-8")
+        page = CachedPage(body)
+        self.pages[template_name] = page
+        return page
+    
+    def render_all(self) -> int:
+        """Render every HTML template that extends the base layout"""
+        if self.auto_reload:
+            self.snapshot = self._latest_mtime()
+        self.pages = {}
+        for name in self.templates.env.list_templates(extensions=["html"]):
+            if name != "base.html":
+                self.render(name)
+        return len(self.pages)
+    
+    def get(self, template_name: str) -> CachedPage:
+        """Get a cached page, re-rendering when templates changed in auto-reload mode"""
+        if self.auto_reload and self._latest_mtime() != self.snapshot:
+            self.render_all()
+        page = self.pages.get(template_name)
+        return page if page is not None else self.render(template_name)
+    
+    def response(self, request: Request, template_name: str) -> Response:
+        """Serve a cached page, answering 304 when the client already has it"""
+        page = self.get(template_name)
+        headers = {"etag": page.etag, "cache-control": PAGE_CACHE_CONTROL, "vary": "Accept-Encoding"}
+        
+        if_none_match = request.headers.get("if-none-match", "")
+        if page.etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+        
+        accepted = {value.split(";")[0].strip() for value in request.headers.get("accept-encoding", "").split(",")}
+        for encoding in ("br", "gzip"):
+            if encoding in accepted and encoding in page.variants:
+                headers["content-encoding"] = encoding
+                return Response(content=page.variants[encoding], media_type="text/html", headers=headers)
+        
+        return Response(content=page.body, media_type="text/html", headers=headers)
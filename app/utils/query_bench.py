@@ -0,0 +1,92 @@
+import time
+from typing import Any, Callable, Dict, List
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+from app.database import engine
+from app.models.session import UserSession
+from app.models.token import EmailVerificationToken
+from app.models.user import User
+from app.utils.db_utils import USER_BY_EMAIL, USER_BY_ID
+from app.utils.session_store import SESSION_BY_TOKEN
+from app.utils.token_utils import VALID_TOKEN
+
+def _time_per_call(func: Callable[[], Any], iterations: int) -> float:
+    """Average microseconds per call after a short warm-up"""
+    for _ in range(min(50, iterations)):
+        func()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+def _sample_keys(db: Session) -> Dict[str, Any]:
+    """Real keys when rows exist so lookups hit the index; placeholders otherwise"""
+    user = db.execute(select(User.id, User.email).limit(1)).first()
+    session_token = db.execute(select(UserSession.session_token).limit(1)).scalar()
+    token = db.execute(select(EmailVerificationToken.token).limit(1)).scalar()
+    return {
+        "user_id": user.id if user else 0,
+        "email": user.email if user else "bench@example.invalid",
+        "session_token": session_token or "bench-session-token",
+        "token": token or "bench-token"
+    }
+
+def _cases(db: Session, keys: Dict[str, Any]) -> Dict[str, Dict[str, Callable[[], Any]]]:
+    from datetime import datetime
+    
+    return {
+        "user_by_email": {
+            "adhoc": lambda: db.query(User).filter(User.email == keys["email"]).first(),
+            "precompiled": lambda: db.execute(USER_BY_EMAIL, {"email": keys["email"]}).scalar_one_or_none()
+        },
+        "user_by_id": {
+            "adhoc": lambda: db.query(User).filter(User.id == keys["user_id"]).first(),
+            "precompiled": lambda: db.execute(USER_BY_ID, {"user_id": keys["user_id"]}).scalar_one_or_none()
+        },
+        "session_by_token": {
+            "adhoc": lambda: db.query(UserSession).filter(UserSession.session_token == keys["session_token"]).first(),
+            "precompiled": lambda: db.execute(SESSION_BY_TOKEN, {"session_token": keys["session_token"]}).scalar_one_or_none()
+        },
+        "verification_token": {
+            "adhoc": lambda: db.query(EmailVerificationToken).filter(
+                EmailVerificationToken.token == keys["token"],
+                EmailVerificationToken.expires_at > datetime.utcnow(),
+                EmailVerificationToken.used == False
+            ).first(),
+            "precompiled": lambda: db.execute(
+                VALID_TOKEN[EmailVerificationToken], {"token_value": keys["token"], "now": datetime.utcnow()}
+            ).scalar_one_or_none()
+        }
+    }
+
+def bench_queries(iterations: int = 2000) -> List[Dict[str, Any]]:
+    """
+    Time the hot-path lookups per call
+    
+    Compares statements rebuilt through db.query() on every call with the
+    module-level statements, and on PostgreSQL also the precompiled
+    statements with server-side prepares disabled, which isolates planning.
+    """
+    sessions = {"": sessionmaker(bind=engine)}
+    if engine.dialect.name == "postgresql":
+        unprepared = create_engine(engine.url, connect_args={"prepare_threshold": None})
+        sessions[" (no server prepare)"] = sessionmaker(bind=unprepared)
+    
+    results = []
+    for suffix, factory in sessions.items():
+        db = factory()
+        try:
+            keys = _sample_keys(db)
+            for query, variants in _cases(db, keys).items():
+                for variant, func in variants.items():
+                    if suffix and variant == "adhoc":
+                        continue
+                    db.expunge_all()
+                    results.append({
+                        "query": query,
+                        "variant": variant + suffix,
+                        "us_per_call": round(_time_per_call(func, iterations), 1)
+                    })
+        finally:
+            db.close()
+    return results
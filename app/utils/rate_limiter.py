@@ -1,3 +1,5 @@
+import os
+import threading
 import time
 from typing import Dict, List, Tuple
 from collections import defaultdict
@@ -49,6 +51,37 @@ class RateLimiter:
         for identifier in expired_identifiers:
             del self.requests[identifier]
 
+class EmailCooldownLedger:
+    """Per-recipient send cooldown so retry storms do not trigger repeated emails"""
+    
+    def __init__(self, cooldown_seconds: int = 60, max_entries: int = 100000):
+        self.cooldown_seconds = cooldown_seconds
+        self.max_entries = max_entries
+        self.last_sent: Dict[str, float] = {}
+        self.lock = threading.Lock()
+        self.suppressed = 0
+    
+    def should_send(self, key: str) -> bool:
+        """Claim the send slot for a key unless one was claimed within the cooldown"""
+        current_time = time.time()
+        with self.lock:
+            last_sent = self.last_sent.get(key)
+            if last_sent is not None and current_time - last_sent < self.cooldown_seconds:
+                self.suppressed += 1
+                return False
+            
+            if len(self.last_sent) >= self.max_entries:
+                self.last_sent = {k: t for k, t in self.last_sent.items()
+                                  if current_time - t < self.cooldown_seconds}
+            self.last_sent[key] = current_time
+            return True
+    
+    def release(self, key: str):
+        """Forget a claim, e.g. when the send failed and a retry should go through"""
+        with self.lock:
+            self.last_sent.pop(key, None)
+
 auth_rate_limiter = RateLimiter(max_requests=5, window_seconds=60)
 signup_rate_limiter = RateLimiter(max_requests=3, window_seconds=300)
-password_reset_rate_limiter = RateLimiter(max_requests=3, window_seconds=300)
\ No newline at end of file
+password_reset_rate_limiter = RateLimiter(max_requests=3, window_seconds=300)
+email_cooldown_ledger = EmailCooldownLedger(cooldown_seconds=int(os.getenv("EMAIL_SEND_COOLDOWN_SECONDS", "60")))
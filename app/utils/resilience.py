@@ -0,0 +1,162 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Tuple, Type
+import requests
+
+logger = logging.getLogger(__name__)
+
+CONNECT_TIMEOUT_SECONDS = float(os.getenv("OUTBOUND_CONNECT_TIMEOUT_SECONDS", "3"))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", "30"))
+BULKHEAD_WAIT_SECONDS = float(os.getenv("BULKHEAD_WAIT_SECONDS", "0.1"))
+
+class DependencyUnavailable(Exception):
+    """Raised when a call is refused by an open breaker or a full bulkhead"""
+    
+    def __init__(self, dependency: str, reason: str):
+        self.dependency = dependency
+        self.reason = reason
+        super().__init__(f"{dependency} unavailable: {reason}")
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker
+    
+    After failure_threshold consecutive failures the breaker opens and calls
+    fail fast. Once reset_timeout has passed a single trial call is let through
+    (half-open); its outcome closes the breaker or opens it again.
+    """
+    
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD, reset_timeout: float = BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.trips = 0
+        self._lock = threading.Lock()
+    
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+            if self.state == "half_open" and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            return False
+    
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self.trial_in_flight = False
+    
+    def record_failure(self) -> bool:
+        """Count a failure; returns True when this failure tripped the breaker"""
+        with self._lock:
+            self.consecutive_failures += 1
+            self.trial_in_flight = False
+            if self.state == "half_open" or (self.state == "closed" and self.consecutive_failures >= self.failure_threshold):
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self.trips += 1
+                return True
+            return False
+
+class Dependency:
+    """Outbound dependency with its own timeout, circuit breaker and concurrency budget (bulkhead)"""
+    
+    def __init__(self, name: str, read_timeout: float, max_concurrent: int):
+        self.name = name
+        self.timeout = (CONNECT_TIMEOUT_SECONDS, read_timeout)
+        self.max_concurrent = max_concurrent
+        self.breaker = CircuitBreaker()
+        self._bulkhead = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.calls = 0
+        self.failures = 0
+        self.short_circuited = 0
+        self.bulkhead_rejected = 0
+    
+    @contextmanager
+    def guard(self, failure_types: Tuple[Type[BaseException], ...] = (requests.RequestException,)):
+        """Run a call under the breaker and bulkhead; exceptions of failure_types count as failures"""
+        if not self._bulkhead.acquire(timeout=BULKHEAD_WAIT_SECONDS):
+            with self._lock:
+                self.bulkhead_rejected += 1
+            raise DependencyUnavailable(self.name, "concurrency limit reached")
+        
+        if not self.breaker.allow():
+            self._bulkhead.release()
+            with self._lock:
+                self.short_circuited += 1
+            raise DependencyUnavailable(self.name, "circuit open")
+        
+        with self._lock:
+            self.in_flight += 1
+            self.calls += 1
+        try:
+            yield
+        except failure_types:
+            self._record_failure()
+            raise
+        except BaseException:
+            self.breaker.record_success()
+            raise
+        else:
+            self.breaker.record_success()
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._bulkhead.release()
+    
+    def _record_failure(self):
+        with self._lock:
+            self.failures += 1
+        if self.breaker.record_failure():
+            logger.warning("Circuit breaker opened", extra={"dependency": self.name})
+    
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """Issue an HTTP request with this dependency's timeout; 5xx and 429 responses count as failures"""
+        with self.guard():
+            response = requests.request(method, url, timeout=self.timeout, **kwargs)
+            if response.status_code >= 500 or response.status_code == 429:
+                raise requests.HTTPError(f"{self.name} returned {response.status_code}", response=response)
+        return response
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.breaker.state,
+            "trips": self.breaker.trips,
+            "consecutive_failures": self.breaker.consecutive_failures,
+            "timeout_seconds": {"connect": self.timeout[0], "read": self.timeout[1]},
+            "max_concurrent": self.max_concurrent,
+            "in_flight": self.in_flight,
+            "calls": self.calls,
+            "failures": self.failures,
+            "short_circuited": self.short_circuited,
+            "bulkhead_rejected": self.bulkhead_rejected
+        }
+
+mailgun = Dependency(
+    "mailgun",
+    read_timeout=float(os.getenv("MAILGUN_TIMEOUT_SECONDS", "5")),
+    max_concurrent=int(os.getenv("MAILGUN_MAX_CONCURRENCY", "4"))
+)
+google_oauth = Dependency(
+    "google_oauth",
+    read_timeout=float(os.getenv("GOOGLE_TIMEOUT_SECONDS", "5")),
+    max_concurrent=int(os.getenv("GOOGLE_MAX_CONCURRENCY", "8"))
+)
+dependencies: Dict[str, Dependency] = {dependency.name: dependency for dependency in (mailgun, google_oauth)}
+
+def resilience_stats() -> Dict[str, Any]:
+    """Breaker state, trip counts and bulkhead usage for every outbound dependency on this worker"""
+    return {name: dependency.stats() for name, dependency in dependencies.items()}
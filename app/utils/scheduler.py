@@ -0,0 +1,358 @@
+import asyncio
+import logging
+import os
+import random
+import socket
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+from app.database import SessionLocal, engine, libpq_url
+from app.models.job_run import JobRun
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, a single SQLite worker always leads
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+SCHEDULER_POLL_SECONDS = float(os.getenv("SCHEDULER_POLL_SECONDS", "15"))
+SCHEDULER_LOCK_KEY = int(os.getenv("SCHEDULER_LOCK_KEY", "7262001"))
+SCHEDULER_JITTER = float(os.getenv("SCHEDULER_JITTER", "0.1"))
+JOB_HISTORY_DAYS = int(os.getenv("JOB_HISTORY_DAYS", "30"))
+
+RUNNER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+def _interval(name: str, default: float) -> float:
+    return float(os.getenv(f"JOB_{name.upper()}_INTERVAL_SECONDS", str(default)))
+
+class Job:
+    """
+    A recurring maintenance job
+    
+    Cluster-wide jobs run only on the elected leader; local jobs maintain
+    per-host state and run on every worker.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[Session], Any],
+        interval_seconds: float,
+        deadline_seconds: float,
+        cluster_wide: bool = True,
+        jitter: float = SCHEDULER_JITTER
+    ):
+        self.name = name
+        self.func = func
+        self.interval_seconds = _interval(name, interval_seconds)
+        self.deadline_seconds = deadline_seconds
+        self.cluster_wide = cluster_wide
+        self.jitter = jitter
+        self.next_run_at = 0.0
+        self.running = False
+        self.last_status: Optional[str] = None
+    
+    def schedule_next(self, base: Optional[float] = None):
+        """Plan the next run one interval (plus or minus jitter) after base"""
+        spread = self.interval_seconds * self.jitter
+        self.next_run_at = (base if base is not None else time.monotonic()) + self.interval_seconds + random.uniform(-spread, spread)
+    
+    def is_due(self) -> bool:
+        return not self.running and time.monotonic() >= self.next_run_at
+
+class LeaderLease:
+    """
+    Cluster-wide leadership held as a session-level pg_try_advisory_lock
+    
+    The lock lives on a dedicated autocommit connection outside the pool and
+    is released by PostgreSQL as soon as that connection drops, so a dead
+    leader is replaced on the next poll. On SQLite the workers share a host,
+    so leadership is an exclusive flock on a file next to the database, which
+    the kernel likewise releases when the process exits. In-memory databases
+    and other engines have a single process and always lead.
+    """
+    
+    def __init__(self, lock_key: int = SCHEDULER_LOCK_KEY):
+        self.lock_key = lock_key
+        self.connection = None
+        self.lock_file = None
+    
+    @staticmethod
+    def _lock_path() -> Optional[str]:
+        database = engine.url.database
+        if engine.dialect.name != "sqlite" or fcntl is None or not database or database == ":memory:":
+            return None
+        return f"{database}.scheduler.lock"
+    
+    @property
+    def is_leader(self) -> bool:
+        if engine.dialect.name == "postgresql":
+            return self.connection is not None
+        if self._lock_path() is not None:
+            return self.lock_file is not None
+        return True
+    
+    async def refresh(self) -> bool:
+        """Keep or try to take leadership; returns whether this worker leads"""
+        if engine.dialect.name != "postgresql":
+            return self._refresh_file_lock()
+        
+        import psycopg
+        
+        if self.connection is not None:
+            try:
+                await self.connection.execute("SELECT 1")
+                return True
+            except Exception as e:
+                logger.warning("Scheduler lost its leader connection", extra={"error_message": str(e)})
+                await self.release()
+        
+        try:
+            connection = await psycopg.AsyncConnection.connect(libpq_url(), autocommit=True)
+            cursor = await connection.execute("SELECT pg_try_advisory_lock(%s)", (self.lock_key,))
+            acquired = (await cursor.fetchone())[0]
+        except Exception as e:
+            logger.warning("Scheduler leader election failed", extra={"error_message": str(e)})
+            return False
+        
+        if not acquired:
+            await connection.close()
+            return False
+        self.connection = connection
+        logger.info("Scheduler leadership acquired", extra={"runner": RUNNER_ID})
+        return True
+    
+    def _refresh_file_lock(self) -> bool:
+        path = self._lock_path()
+        if path is None or self.lock_file is not None:
+            return True
+        
+        lock_file = None
+        try:
+            lock_file = open(path, "a")
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        except OSError as e:
+            if lock_file is not None:
+                lock_file.close()
+            logger.warning("Scheduler leader election failed", extra={"error_message": str(e)})
+            return False
+        
+        self.lock_file = lock_file
+        logger.info("Scheduler leadership acquired", extra={"runner": RUNNER_ID, "lock_file": path})
+        return True
+    
+    async def release(self):
+        connection, self.connection = self.connection, None
+        if connection is not None:
+            try:
+                await connection.close()
+            except Exception:
+                pass
+        
+        lock_file, self.lock_file = self.lock_file, None
+        if lock_file is not None:
+            lock_file.close()
+
+def _start_run(job_name: str) -> int:
+    db = SessionLocal()
+    try:
+        run_id = db.execute(
+            insert(JobRun).values(job_name=job_name, status="running", runner=RUNNER_ID).returning(JobRun.id)
+        ).scalar_one()
+        db.commit()
+        return run_id
+    finally:
+        db.close()
+
+def _finish_run(run_id: int, status: str, duration_ms: float, result: Any = None, error: Optional[str] = None):
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(JobRun)
+            .where(JobRun.id == run_id)
+            .values(
+                status=status,
+                finished_at=func.now(),
+                duration_ms=round(duration_ms, 2),
+                result=None if result is None else str(result)[:255],
+                error=error
+            )
+        )
+        db.commit()
+    finally:
+        db.close()
+
+def _call(job: Job) -> Any:
+    db = SessionLocal()
+    try:
+        return job.func(db)
+    finally:
+        db.close()
+
+def _last_started(job_names: List[str]) -> Dict[str, datetime]:
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(JobRun.job_name, func.max(JobRun.started_at))
+            .where(JobRun.job_name.in_(job_names), JobRun.status != "failed")
+            .group_by(JobRun.job_name)
+        ).all()
+        return {name: started_at for name, started_at in rows if started_at is not None}
+    finally:
+        db.close()
+
+class Scheduler:
+    """Async scheduler that runs due jobs in worker threads under per-job deadlines"""
+    
+    def __init__(self, jobs: List[Job], lease: LeaderLease):
+        self.jobs = jobs
+        self.lease = lease
+        self.leading = False
+        self.tasks: set = set()
+        for job in jobs:
+            if not job.cluster_wide:
+                job.schedule_next()
+    
+    async def _sync_with_history(self):
+        """On gaining leadership, continue the cluster's cadence instead of running everything at once"""
+        cluster_jobs = [job for job in self.jobs if job.cluster_wide]
+        last_started = await asyncio.to_thread(_last_started, [job.name for job in cluster_jobs])
+        now_wall = datetime.now(timezone.utc)
+        now = time.monotonic()
+        for job in cluster_jobs:
+            started_at = last_started.get(job.name)
+            if started_at is None:
+                job.next_run_at = now
+                continue
+            if started_at.tzinfo is None:
+                started_at = started_at.replace(tzinfo=timezone.utc)
+            job.schedule_next(base=now - (now_wall - started_at).total_seconds())
+    
+    async def run_job(self, job: Job):
+        """Run one job, enforce its deadline and record the outcome in job_runs"""
+        job.running = True
+        loop = asyncio.get_running_loop()
+        status, result, error = "succeeded", None, None
+        start = time.perf_counter()
+        run_id = None
+        future = None
+        try:
+            run_id = await asyncio.to_thread(_start_run, job.name)
+            future = loop.run_in_executor(None, _call, job)
+            result = await asyncio.wait_for(asyncio.shield(future), job.deadline_seconds)
+        except asyncio.TimeoutError:
+            status, error = "timeout", f"exceeded deadline of {job.deadline_seconds}s"
+            logger.warning("Scheduled job exceeded its deadline", extra={"job": job.name})
+        except Exception as e:
+            status, error = "failed", str(e)
+            logger.error("Scheduled job failed", extra={"job": job.name, "error_message": str(e)})
+        
+        duration_ms = (time.perf_counter() - start) * 1000
+        job.last_status = status
+        job.schedule_next()
+        if status == "timeout" and future is not None:
+            # The thread cannot be interrupted; keep the job blocked until it actually finishes
+            future.add_done_callback(lambda _: setattr(job, "running", False))
+        else:
+            job.running = False
+        
+        if run_id is not None:
+            try:
+                await asyncio.to_thread(_finish_run, run_id, status, duration_ms, result, error)
+            except Exception as e:
+                logger.warning("Failed to record job run", extra={"job": job.name, "error_message": str(e)})
+    
+    def _spawn(self, job: Job):
+        task = asyncio.create_task(self.run_job(job))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+    
+    async def run(self, poll_seconds: float = SCHEDULER_POLL_SECONDS):
+        """Poll for leadership and due jobs until cancelled"""
+        try:
+            while True:
+                leading = await self.lease.refresh()
+                if leading and not self.leading:
+                    await self._sync_with_history()
+                self.leading = leading
+                
+                for job in self.jobs:
+                    if (leading or not job.cluster_wide) and job.is_due():
+                        self._spawn(job)
+                
+                await asyncio.sleep(poll_seconds * random.uniform(0.9, 1.1))
+        finally:
+            self.leading = False
+            await self.lease.release()
+    
+    def status(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "enabled": SCHEDULER_ENABLED,
+            "runner": RUNNER_ID,
+            "leader": self.leading,
+            "jobs": [
+                {
+                    "name": job.name,
+                    "cluster_wide": job.cluster_wide,
+                    "interval_seconds": job.interval_seconds,
+                    "deadline_seconds": job.deadline_seconds,
+                    "running": job.running,
+                    "last_status": job.last_status,
+                    "next_run_in_seconds": round(max(0.0, job.next_run_at - now), 1) if job.next_run_at else None
+                }
+                for job in self.jobs
+            ]
+        }
+
+def prune_job_runs(db: Session) -> int:
+    """Delete job history older than JOB_HISTORY_DAYS"""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=JOB_HISTORY_DAYS)
+    count = db.execute(delete(JobRun).where(JobRun.started_at < cutoff)).rowcount
+    db.commit()
+    return count
+
+def _default_jobs() -> List[Job]:
+    from app.utils.analytics import refresh_rollups
+    from app.utils.auth_events import ensure_auth_event_partitions
+    from app.utils.session_store import session_store
+    from app.utils.session_utils import cleanup_expired_sessions
+    from app.utils.token_utils import cleanup_expired_tokens
+    
+    return [
+        Job("cleanup_sessions", cleanup_expired_sessions, 3600, 300, cluster_wide=session_store.shared),
+        Job("cleanup_tokens", cleanup_expired_tokens, 3600, 300),
+        Job("refresh_rollups", refresh_rollups, 300, 240),
+        Job("auth_event_partitions", ensure_auth_event_partitions, 86400, 60),
+        Job("prune_job_runs", prune_job_runs, 86400, 60)
+    ]
+
+scheduler = Scheduler(_default_jobs(), LeaderLease())
+
+async def run_scheduler():
+    """Background task entry point"""
+    if SCHEDULER_ENABLED:
+        await scheduler.run()
+
+def recent_job_runs(db: Session, limit: int = 50) -> List[Dict[str, Any]]:
+    rows = db.execute(select(JobRun).order_by(JobRun.id.desc()).limit(limit)).scalars().all()
+    return [
+        {
+            "job_name": row.job_name,
+            "status": row.status,
+            "runner": row.runner,
+            "started_at": row.started_at,
+            "finished_at": row.finished_at,
+            "duration_ms": row.duration_ms,
+            "result": row.result,
+            "error": row.error
+        }
+        for row in rows
+    ]
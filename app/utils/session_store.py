@@ -0,0 +1,321 @@
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+from sqlalchemy import bindparam, delete, or_, select, update
+from sqlalchemy.orm import Session
+from app.models.session import UserSession
+from app.utils.cache_bus import LocalCache, LOCAL_CACHE_TTL_SECONDS, LOCAL_CACHE_MAX_ENTRIES, publish_invalidation, subscribe, subscribe_batch, token_digest
+from app.utils.single_flight import single_flight
+
+SESSION_STORE = os.getenv("SESSION_STORE", "sql")
+SESSION_STORE_PATH = os.getenv("SESSION_STORE_PATH", "sessions.db")
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+class SessionRecord:
+    """Backend-independent view of a stored session"""
+    
+    def __init__(self, id: int, session_token: str, user_id: int, expires_at: datetime, created_at: Optional[datetime]):
+        self.id = id
+        self.session_token = session_token
+        self.user_id = user_id
+        self.expires_at = _as_utc(expires_at)
+        self.created_at = _as_utc(created_at)
+    
+    def __repr__(self):
+        return f"<SessionRecord(id={self.id}, user_id={self.user_id}, expires_at='{self.expires_at}')>"
+
+class SessionStore(ABC):
+    """
+    Persistence interface for user sessions
+    
+    Every method receives the caller's database session; backends that do not
+    keep sessions in the application database ignore it. Backends whose rows
+    are not removed by ON DELETE CASCADE leave cascades_with_users False so
+    user deletion clears their sessions explicitly. Backends that are not
+    shared across hosts leave shared False so maintenance runs on every worker.
+    """
+    
+    name = "base"
+    cascades_with_users = False
+    shared = False
+    
+    @abstractmethod
+    def create(self, db: Session, session_token: str, user_id: int, expires_at: datetime, created_at: datetime) -> SessionRecord:
+        """Store a new session and return it"""
+    
+    @abstractmethod
+    def get(self, db: Session, session_token: str) -> Optional[SessionRecord]:
+        """Look up a session by token, expired or not"""
+    
+    @abstractmethod
+    def renew(self, db: Session, expiries: Dict[int, datetime]) -> int:
+        """Write new expiry times keyed by session id"""
+    
+    @abstractmethod
+    def delete(self, db: Session, session_token: str) -> Optional[SessionRecord]:
+        """Delete one session; returns the deleted session, or None when it did not exist"""
+    
+    @abstractmethod
+    def delete_user(self, db: Session, user_id: int) -> int:
+        """Delete every session of a user; returns how many were removed"""
+    
+    @abstractmethod
+    def cleanup(self, db: Session, now: datetime, created_before: datetime) -> int:
+        """Delete sessions that expired or were created before the absolute lifetime cutoff"""
+
+session_cache = LocalCache(ttl_seconds=LOCAL_CACHE_TTL_SECONDS, max_entries=LOCAL_CACHE_MAX_ENTRIES)
+subscribe("session", session_cache.delete)
+subscribe("user_sessions", lambda key: session_cache.delete_where(lambda _, value: value["user_id"] == int(key)))
+
+def _forget_user_sessions(keys):
+    user_ids = {int(key) for key in keys}
+    session_cache.delete_where(lambda _, value: value["user_id"] in user_ids)
+
+subscribe_batch("users_deleted", _forget_user_sessions)
+
+SESSION_BY_TOKEN = select(UserSession).where(UserSession.session_token == bindparam("session_token"))
+
+class SqlSessionStore(SessionStore):
+    """Sessions as rows of user_sessions in the application database, fronted by the local cache"""
+    
+    name = "sql"
+    cascades_with_users = True
+    shared = True
+    
+    @staticmethod
+    def _values(session: UserSession) -> Dict[str, Any]:
+        return {
+            "id": session.id,
+            "session_token": session.session_token,
+            "user_id": session.user_id,
+            "expires_at": session.expires_at,
+            "created_at": session.created_at
+        }
+    
+    def create(self, db, session_token, user_id, expires_at, created_at):
+        session = UserSession(session_token=session_token, user_id=user_id, expires_at=expires_at, created_at=created_at)
+        db.add(session)
+        db.commit()
+        db.refresh(session)
+        return SessionRecord(**self._values(session))
+    
+    def get(self, db, session_token):
+        digest = token_digest(session_token)
+        values = session_cache.get(digest)
+        if values is None or _as_utc(values["expires_at"]) <= datetime.now(timezone.utc):
+            def load():
+                session = db.execute(SESSION_BY_TOKEN, {"session_token": session_token}).scalar_one_or_none()
+                if session is None:
+                    return None
+                values = self._values(session)
+                session_cache.set(digest, values)
+                return values
+            
+            values, _ = single_flight.do("session_by_token", digest, load)
+        return SessionRecord(**values) if values is not None else None
+    
+    def renew(self, db, expiries):
+        db.execute(
+            update(UserSession),
+            [{"id": session_id, "expires_at": expires_at} for session_id, expires_at in expiries.items()]
+        )
+        db.commit()
+        # Cached snapshots still carry the old expiry and would be renewed again until they age out
+        session_cache.delete_where(lambda _, value: value["id"] in expiries)
+        return len(expiries)
+    
+    def delete(self, db, session_token):
+        row = db.execute(
+            delete(UserSession)
+            .where(UserSession.session_token == session_token)
+            .returning(UserSession.id, UserSession.user_id, UserSession.expires_at, UserSession.created_at)
+        ).first()
+        if row is not None:
+            publish_invalidation(db, "session", token_digest(session_token))
+        db.commit()
+        return SessionRecord(row.id, session_token, row.user_id, row.expires_at, row.created_at) if row else None
+    
+    def delete_user(self, db, user_id):
+        count = db.execute(
+            delete(UserSession).where(UserSession.user_id == user_id).execution_options(synchronize_session=False)
+        ).rowcount
+        publish_invalidation(db, "user_sessions", user_id)
+        db.commit()
+        return count
+    
+    def cleanup(self, db, now, created_before):
+        count = db.execute(
+            delete(UserSession).where(
+                or_(UserSession.expires_at <= now, UserSession.created_at <= created_before)
+            ).execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        return count
+
+class SqliteSessionStore(SessionStore):
+    """
+    Sessions in a local SQLite file in WAL mode
+    
+    Readers never block the writer, so every worker process on a host can
+    share one file without touching the application database. Tokens are
+    stored as digests and timestamps as epoch seconds.
+    """
+    
+    name = "sqlite"
+    
+    def __init__(self, path: str = SESSION_STORE_PATH):
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "token_digest TEXT NOT NULL UNIQUE, "
+                "user_id INTEGER NOT NULL, "
+                "expires_at REAL NOT NULL, "
+                "created_at REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS ix_sessions_user_id ON sessions (user_id)")
+    
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+    
+    @staticmethod
+    def _to_datetime(value: float) -> datetime:
+        return datetime.fromtimestamp(value, tz=timezone.utc)
+    
+    def create(self, db, session_token, user_id, expires_at, created_at):
+        with self._connection() as connection:
+            cursor = connection.execute(
+                "INSERT INTO sessions (token_digest, user_id, expires_at, created_at) VALUES (?, ?, ?, ?)",
+                (token_digest(session_token), user_id, expires_at.timestamp(), created_at.timestamp())
+            )
+        return SessionRecord(cursor.lastrowid, session_token, user_id, expires_at, created_at)
+    
+    def get(self, db, session_token):
+        row = self._connection().execute(
+            "SELECT id, user_id, expires_at, created_at FROM sessions WHERE token_digest = ?",
+            (token_digest(session_token),)
+        ).fetchone()
+        if row is None:
+            return None
+        return SessionRecord(row[0], session_token, row[1], self._to_datetime(row[2]), self._to_datetime(row[3]))
+    
+    def renew(self, db, expiries):
+        with self._connection() as connection:
+            connection.executemany(
+                "UPDATE sessions SET expires_at = ? WHERE id = ?",
+                [(expires_at.timestamp(), session_id) for session_id, expires_at in expiries.items()]
+            )
+        return len(expiries)
+    
+    def delete(self, db, session_token):
+        with self._connection() as connection:
+            row = connection.execute(
+                "DELETE FROM sessions WHERE token_digest = ? RETURNING id, user_id, expires_at, created_at",
+                (token_digest(session_token),)
+            ).fetchone()
+        if row is None:
+            return None
+        return SessionRecord(row[0], session_token, row[1], self._to_datetime(row[2]), self._to_datetime(row[3]))
+    
+    def delete_user(self, db, user_id):
+        with self._connection() as connection:
+            return connection.execute("DELETE FROM sessions WHERE user_id = ?", (user_id,)).rowcount
+    
+    def cleanup(self, db, now, created_before):
+        with self._connection() as connection:
+            return connection.execute(
+                "DELETE FROM sessions WHERE expires_at <= ? OR created_at <= ?",
+                (now.timestamp(), created_before.timestamp())
+            ).rowcount
+
+class MemorySessionStore(SessionStore):
+    """Process-local sessions; for tests and single-process development only"""
+    
+    name = "memory"
+    
+    def __init__(self):
+        self._by_token: Dict[str, SessionRecord] = {}
+        self._by_id: Dict[int, SessionRecord] = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+    
+    def create(self, db, session_token, user_id, expires_at, created_at):
+        with self._lock:
+            record = SessionRecord(self._next_id, session_token, user_id, expires_at, created_at)
+            self._next_id += 1
+            self._by_token[session_token] = record
+            self._by_id[record.id] = record
+        return record
+    
+    def get(self, db, session_token):
+        with self._lock:
+            record = self._by_token.get(session_token)
+            if record is None:
+                return None
+            return SessionRecord(record.id, record.session_token, record.user_id, record.expires_at, record.created_at)
+    
+    def renew(self, db, expiries):
+        with self._lock:
+            for session_id, expires_at in expiries.items():
+                record = self._by_id.get(session_id)
+                if record is not None:
+                    record.expires_at = expires_at
+        return len(expiries)
+    
+    def _remove(self, record: SessionRecord):
+        self._by_token.pop(record.session_token, None)
+        self._by_id.pop(record.id, None)
+    
+    def delete(self, db, session_token):
+        with self._lock:
+            record = self._by_token.get(session_token)
+            if record is None:
+                return None
+            self._remove(record)
+            return record
+    
+    def delete_user(self, db, user_id):
+        with self._lock:
+            records = [record for record in self._by_id.values() if record.user_id == user_id]
+            for record in records:
+                self._remove(record)
+            return len(records)
+    
+    def cleanup(self, db, now, created_before):
+        with self._lock:
+            records = [
+                record for record in self._by_id.values()
+                if record.expires_at <= now or record.created_at <= created_before
+            ]
+            for record in records:
+                self._remove(record)
+            return len(records)
+
+SESSION_STORES = {
+    "sql": SqlSessionStore,
+    "sqlite": SqliteSessionStore,
+    "memory": MemorySessionStore
+}
+
+def create_session_store(name: str = SESSION_STORE) -> SessionStore:
+    """Instantiate the configured session backend"""
+    if name not in SESSION_STORES:
+        raise ValueError(f"Unknown SESSION_STORE '{name}'. Use one of: {', '.join(SESSION_STORES)}")
+    return SESSION_STORES[name]()
+
+session_store = create_session_store()
@@ -1,34 +1,177 @@
-from datetime import datetime, timedelta
-from typing import Optional
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+from fastapi import Request, Response
 from sqlalchemy.orm import Session
-from app.models.session import UserSession
+from app.database import SessionLocal
 from app.models.user import User
 from app.utils.auth_utils import generate_session_token
+from app.utils.db_utils import get_user_by_id
+from app.utils.session_store import SessionRecord, session_store
 
-def create_user_session(db: Session, user_id: int, expires_in_hours: int = 24) -> UserSession:
+SESSION_IDLE_TIMEOUT = timedelta(minutes=int(os.getenv("SESSION_IDLE_TIMEOUT_MINUTES", "1440")))
+SESSION_ABSOLUTE_LIFETIME = timedelta(hours=int(os.getenv("SESSION_ABSOLUTE_LIFETIME_HOURS", "168")))
+SESSION_RENEWAL_THRESHOLD = timedelta(minutes=int(os.getenv("SESSION_RENEWAL_THRESHOLD_MINUTES", "15")))
+SESSION_RENEWAL_FLUSH_SECONDS = float(os.getenv("SESSION_RENEWAL_FLUSH_SECONDS", "30"))
+SESSION_RENEWAL_MAX_PENDING = int(os.getenv("SESSION_RENEWAL_MAX_PENDING", "500"))
+SESSION_COOKIE_NAME = os.getenv("SESSION_COOKIE_NAME", "session_token")
+SESSION_COOKIE_SECURE = os.getenv("SESSION_COOKIE_SECURE", "true").lower() == "true"
+
+def utcnow() -> datetime:
+    """Current time as an aware UTC datetime"""
+    return datetime.now(timezone.utc)
+
+def as_utc(value: datetime) -> datetime:
+    """Treat naive datetimes read back from the database as UTC"""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+class SessionRenewalBuffer:
+    """
+    Write-behind buffer for sliding session renewals
+    
+    Renewed expiry times are kept in memory per session id and written in a
+    single batch once the buffer is full or the flush interval elapses,
+    so the write rate stays far below the read rate.
+    """
+    
+    def __init__(self, flush_interval_seconds: float = 30, max_pending: int = 500):
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_pending = max_pending
+        self.pending: Dict[int, datetime] = {}
+        self.lock = threading.Lock()
+        self.last_flush = time.monotonic()
+        self.renewals_scheduled = 0
+        self.rows_written = 0
+    
+    def schedule(self, session_id: int, expires_at: datetime):
+        """Record a renewed expiry for a session"""
+        with self.lock:
+            current = self.pending.get(session_id)
+            if current is None or expires_at > current:
+                self.pending[session_id] = expires_at
+            self.renewals_scheduled += 1
+    
+    def pending_expiry(self, session_id: int) -> Optional[datetime]:
+        """Get a renewed expiry that has not been written yet"""
+        with self.lock:
+            return self.pending.get(session_id)
+    
+    def discard(self, session_id: int):
+        """Forget a pending renewal (e.g. after logout)"""
+        with self.lock:
+            self.pending.pop(session_id, None)
+    
+    def should_flush(self) -> bool:
+        """Check whether the buffer is full or due"""
+        with self.lock:
+            if not self.pending:
+                return False
+            return (len(self.pending) >= self.max_pending
+                    or time.monotonic() - self.last_flush >= self.flush_interval_seconds)
+    
+    def flush(self, db: Session) -> int:
+        """Write all pending renewals to the session store in one batch"""
+        with self.lock:
+            pending = self.pending
+            self.pending = {}
+            self.last_flush = time.monotonic()
+        
+        if not pending:
+            return 0
+        
+        session_store.renew(db, pending)
+        self.rows_written += len(pending)
+        return len(pending)
+
+renewal_buffer = SessionRenewalBuffer(
+    flush_interval_seconds=SESSION_RENEWAL_FLUSH_SECONDS,
+    max_pending=SESSION_RENEWAL_MAX_PENDING
+)
+
+def flush_session_renewals() -> int:
+    """Flush pending session renewals using a dedicated database session"""
+    db = SessionLocal()
+    try:
+        return renewal_buffer.flush(db)
+    finally:
+        db.close()
+
+async def run_session_renewal_flusher():
+    """Periodically flush pending renewals so idle workers do not hold them"""
+    while True:
+        await asyncio.sleep(SESSION_RENEWAL_FLUSH_SECONDS)
+        if renewal_buffer.should_flush():
+            await asyncio.to_thread(flush_session_renewals)
+
+def create_user_session(db: Session, user_id: int, expires_in_hours: int = None) -> SessionRecord:
     """Create a new user session"""
     session_token = generate_session_token()
     
-    expires_at = datetime.utcnow() + timedelta(hours=expires_in_hours)
+    now = utcnow()
+    lifetime = timedelta(hours=expires_in_hours) if expires_in_hours else SESSION_IDLE_TIMEOUT
+    expires_at = now + min(lifetime, SESSION_ABSOLUTE_LIFETIME)
     
-    session = UserSession(
-        session_token=session_token,
-        user_id=user_id,
-        expires_at=expires_at
-    )
+    return session_store.create(db, session_token, user_id, expires_at, now)
+
+def set_session_cookie(response: Response, session: SessionRecord):
+    """
+    Mirror the session token into an HttpOnly cookie so pages can be rendered server-side
     
-    db.add(session)
-    db.commit()
-    db.refresh(session)
+    The cookie lives for the absolute session lifetime; idle expiry is still
+    enforced on the server by get_session_by_token.
+    """
+    response.set_cookie(
+        SESSION_COOKIE_NAME,
+        session.session_token,
+        max_age=int(SESSION_ABSOLUTE_LIFETIME.total_seconds()),
+        httponly=True,
+        secure=SESSION_COOKIE_SECURE,
+        samesite="lax"
+    )
+
+def request_session_token(request: Request, session_token: Optional[str]) -> Optional[str]:
+    """
+    Session token from the query parameter, falling back to the session cookie
     
-    return session
+    The cookie is SameSite=lax, so cross-site POST and PUT requests never carry it.
+    """
+    return session_token or request.cookies.get(SESSION_COOKIE_NAME)
+
+def clear_session_cookie(response: Response):
+    response.delete_cookie(SESSION_COOKIE_NAME, httponly=True, secure=SESSION_COOKIE_SECURE, samesite="lax")
 
-def get_session_by_token(db: Session, session_token: str) -> Optional[UserSession]:
-    """Get session by token if it's valid and not expired"""
-    session = db.query(UserSession).filter(
-        UserSession.session_token == session_token,
-        UserSession.expires_at > datetime.utcnow()
-    ).first()
+def get_session_by_token(db: Session, session_token: str) -> Optional[SessionRecord]:
+    """
+    Get session by token if it's valid and not expired
+    
+    Valid sessions slide forward by the idle timeout (capped by the absolute
+    lifetime), but the renewal is only buffered once the stored expiry lags
+    the new one by more than the renewal threshold.
+    """
+    now = utcnow()
+    session = session_store.get(db, session_token)
+    if not session:
+        return None
+    
+    expires_at = as_utc(session.expires_at)
+    pending = renewal_buffer.pending_expiry(session.id)
+    if pending and pending > expires_at:
+        expires_at = pending
+    
+    absolute_expiry = as_utc(session.created_at or now) + SESSION_ABSOLUTE_LIFETIME
+    if expires_at <= now or absolute_expiry <= now:
+        return None
+    
+    renewed_expiry = min(now + SESSION_IDLE_TIMEOUT, absolute_expiry)
+    if renewed_expiry - expires_at >= SESSION_RENEWAL_THRESHOLD:
+        renewal_buffer.schedule(session.id, renewed_expiry)
+        if renewal_buffer.should_flush():
+            flush_session_renewals()
     
     return session
 
@@ -36,36 +179,24 @@ def get_user_from_session(db: Session, session_token: str) -> Optional[User]:
     """Get user from session token"""
     session = get_session_by_token(db, session_token)
     if session:
-        return session.user
+        return get_user_by_id(db, session.user_id)
     return None
 
-def delete_session(db: Session, session_token: str) -> bool:
-    """Delete a session by token"""
-    session = db.query(UserSession).filter(UserSession.session_token == session_token).first()
-    if session:
-        db.delete(session)
-        db.commit()
-        return True
-    return False
+def delete_session(db: Session, session_token: str) -> Optional[SessionRecord]:
+    """Delete a session by token; returns the deleted session, or None when it did not exist"""
+    session = session_store.delete(db, session_token)
+    if session is None:
+        return None
+    renewal_buffer.discard(session.id)
+    return session
 
 def delete_user_sessions(db: Session, user_id: int) -> int:
     """Delete all sessions for a user"""
-    sessions = db.query(UserSession).filter(UserSession.user_id == user_id).all()
-    count = len(sessions)
-    for session in sessions:
-        db.delete(session)
-    db.commit()
-    return count
+    return session_store.delete_user(db, user_id)
 
 def cleanup_expired_sessions(db: Session) -> int:
     """Clean up expired sessions"""
-    expired_sessions = db.query(UserSession).filter(
-        UserSession.expires_at <= datetime.utcnow()
-    ).all()
-    
-    count = len(expired_sessions)
-    for session in expired_sessions:
-        db.delete(session)
+    renewal_buffer.flush(db)
     
-    db.commit()
-    return count 
\ No newline at end of file
+    now = utcnow()
+    return session_store.cleanup(db, now, now - SESSION_ABSOLUTE_LIFETIME)
@@ -0,0 +1,145 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+from typing import Any, Dict, Optional
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from app.models.user import User
+from app.utils.auth_utils import hash_password
+from app.utils.cache_bus import publish_invalidation
+
+EMAIL_TOKEN_MODE = os.getenv("EMAIL_TOKEN_MODE", "database")
+TOKEN_SIGNING_SECRET = os.getenv("TOKEN_SIGNING_SECRET")
+
+PURPOSE_VERIFY_EMAIL = "verify_email"
+PURPOSE_RESET_PASSWORD = "reset_password"
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+def _signature(payload: str) -> str:
+    if not TOKEN_SIGNING_SECRET:
+        raise RuntimeError("TOKEN_SIGNING_SECRET must be set to use signed email tokens")
+    return _b64encode(hmac.new(TOKEN_SIGNING_SECRET.encode("utf-8"), payload.encode("ascii"), hashlib.sha256).digest())
+
+def state_fingerprint(purpose: str, state: Optional[str]) -> str:
+    """Fingerprint of the mutable user state a link is bound to; changing the state voids the link"""
+    return _b64encode(hashlib.sha256(f"{purpose}:{state or ''}".encode("utf-8")).digest()[:12])
+
+def verification_fingerprint(is_verified: bool) -> str:
+    return state_fingerprint(PURPOSE_VERIFY_EMAIL, "verified" if is_verified else "unverified")
+
+def password_fingerprint(hashed_password: Optional[str]) -> str:
+    return state_fingerprint(PURPOSE_RESET_PASSWORD, hashed_password)
+
+def check_signing_config():
+    """Fail at startup, not at the first signup, when signed mode has no secret to sign with"""
+    if EMAIL_TOKEN_MODE not in ("database", "signed"):
+        raise RuntimeError(f"EMAIL_TOKEN_MODE must be 'database' or 'signed', not {EMAIL_TOKEN_MODE!r}")
+    if EMAIL_TOKEN_MODE == "signed" and not TOKEN_SIGNING_SECRET:
+        raise RuntimeError("TOKEN_SIGNING_SECRET must be set when EMAIL_TOKEN_MODE=signed")
+
+def is_signed_token(token: str) -> bool:
+    """
+    Signed tokens contain a '.', which random database tokens never do
+    
+    Only considered while signed links can exist (signed mode, or a secret kept
+    configured after switching back); otherwise every token is a database token.
+    """
+    return "." in token and (EMAIL_TOKEN_MODE == "signed" or bool(TOKEN_SIGNING_SECRET))
+
+def create_signed_token(user_id: int, purpose: str, fingerprint: str, expires_in_seconds: int) -> str:
+    """Create an expiring, HMAC-signed token carrying the user id, purpose and state fingerprint"""
+    payload = _b64encode(json.dumps({
+        "u": user_id,
+        "p": purpose,
+        "e": int(time.time()) + expires_in_seconds,
+        "f": fingerprint
+    }, separators=(",", ":")).encode("utf-8"))
+    return f"{payload}.{_signature(payload)}"
+
+def decode_signed_token(token: str, purpose: str) -> Optional[Dict[str, Any]]:
+    """Return the claims of a well-signed, unexpired token for the given purpose (None for anything else)"""
+    if not TOKEN_SIGNING_SECRET:
+        return None
+    try:
+        payload, signature = token.split(".", 1)
+        if not hmac.compare_digest(signature, _signature(payload)):
+            return None
+        claims = json.loads(_b64decode(payload))
+    except (ValueError, TypeError, UnicodeError):
+        return None
+    
+    if not isinstance(claims, dict) or not {"u", "p", "e", "f"} <= claims.keys():
+        return None
+    if not isinstance(claims["u"], int) or not isinstance(claims["e"], int):
+        return None
+    if claims["p"] != purpose or claims["e"] < time.time():
+        return None
+    return claims
+
+def verify_email_with_signed_token(db: Session, token: str) -> Optional[int]:
+    """
+    Verify an email from a signed link with a single conditional UPDATE
+    
+    The link is bound to the unverified state, and the UPDATE only matches an
+    unverified user, so a link can be used once.
+    """
+    claims = decode_signed_token(token, PURPOSE_VERIFY_EMAIL)
+    if not claims or claims["f"] != verification_fingerprint(False):
+        return None
+    
+    user_id = db.execute(
+        update(User)
+        .where(User.id == claims["u"], User.is_verified == False)
+        .values(is_verified=True)
+        .returning(User.id)
+        .execution_options(synchronize_session=False)
+    ).scalar_one_or_none()
+    
+    if user_id is None:
+        db.rollback()
+        return None
+    publish_invalidation(db, "user", user_id)
+    db.commit()
+    return user_id
+
+def reset_password_with_signed_token(db: Session, token: str, new_password: str) -> Optional[int]:
+    """
+    Reset a password from a signed link
+    
+    The link is bound to the password hash it was issued for; the new hash is
+    written with a compare-and-set on that old hash, so the link stops working
+    as soon as the password changes.
+    """
+    claims = decode_signed_token(token, PURPOSE_RESET_PASSWORD)
+    if not claims:
+        return None
+    
+    current_hash = db.execute(
+        select(User.hashed_password).where(User.id == claims["u"])
+    ).first()
+    if current_hash is None or claims["f"] != password_fingerprint(current_hash[0]):
+        db.rollback()
+        return None
+    
+    user_id = db.execute(
+        update(User)
+        .where(User.id == claims["u"], User.hashed_password.is_not_distinct_from(current_hash[0]))
+        .values(hashed_password=hash_password(new_password))
+        .returning(User.id)
+        .execution_options(synchronize_session=False)
+    ).scalar_one_or_none()
+    
+    if user_id is None:
+        db.rollback()
+        return None
+    publish_invalidation(db, "user", user_id)
+    db.commit()
+    return user_id
@@ -0,0 +1,107 @@
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, Hashable, Optional
+from sqlalchemy.orm import Session
+from app.utils.cache_bus import restore, snapshot
+
+MAX_TRACKED_KEYS = 1000
+
+class _Call:
+    """An in-flight lookup that concurrent callers wait on"""
+    
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical lookups into one execution
+    
+    The first caller for a key runs the loader; callers arriving while it is in
+    flight wait for and share its result (or exception). Nothing is cached once
+    the call completes.
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls: Dict[tuple, _Call] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self.absorbed_by_key: Counter = Counter()
+    
+    def do(self, namespace: str, key: Hashable, loader: Callable[[], Any]) -> tuple:
+        """
+        Run loader once per in-flight key
+        
+        Returns:
+            (result, shared) where shared is True for callers that were coalesced
+        """
+        call_key = (namespace, key)
+        leader = False
+        with self.lock:
+            stats = self.stats.setdefault(namespace, {"calls": 0, "executed": 0, "absorbed": 0})
+            stats["calls"] += 1
+            call = self.calls.get(call_key)
+            if call is not None:
+                stats["absorbed"] += 1
+                if len(self.absorbed_by_key) >= MAX_TRACKED_KEYS and call_key not in self.absorbed_by_key:
+                    self.absorbed_by_key.clear()
+                self.absorbed_by_key[call_key] += 1
+            else:
+                call = _Call()
+                self.calls[call_key] = call
+                stats["executed"] += 1
+                leader = True
+        
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        
+        try:
+            call.result = loader()
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                self.calls.pop(call_key, None)
+            call.event.set()
+    
+    def report(self, top: int = 20) -> Dict[str, Any]:
+        """Per-namespace counters and the keys that absorbed the most duplicates"""
+        with self.lock:
+            return {
+                "namespaces": {name: dict(stats) for name, stats in self.stats.items()},
+                "in_flight": len(self.calls),
+                "top_keys": [
+                    {"namespace": namespace, "key": str(key), "absorbed": count}
+                    for (namespace, key), count in self.absorbed_by_key.most_common(top)
+                ]
+            }
+
+single_flight = SingleFlight()
+
+def coalesced_load(db: Session, namespace: str, key: Hashable, model, loader: Callable[[], Any]):
+    """
+    Load an ORM row through single-flight and attach it to the caller's session
+    
+    The leader returns its own instance; coalesced callers receive the leader's
+    column snapshot merged into their session, so no instance is shared across
+    sessions or threads.
+    """
+    holder = {}
+    
+    def load_snapshot():
+        instance = loader()
+        holder["instance"] = instance
+        return snapshot(instance) if instance is not None else None
+    
+    values, shared = single_flight.do(namespace, key, load_snapshot)
+    if not shared:
+        return holder["instance"]
+    if values is None:
+        return None
+    return restore(db, model, values)
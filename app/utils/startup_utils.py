@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+from fastapi.templating import Jinja2Templates
+from app.database import warm_up_pool
+
+startup_state: Dict[str, Any] = {
+    "ready": False,
+    "started_at": time.monotonic(),
+    "warmup_seconds": None,
+    "warm_connections": 0,
+    "templates_compiled": 0
+}
+
+def precompile_templates(templates: Jinja2Templates) -> int:
+    """Load and compile every template so the first page view skips Jinja2 parsing"""
+    names = templates.env.list_templates(extensions=["html"])
+    for name in names:
+        templates.env.get_template(name)
+    return len(names)
+
+def warm_up(templates: Jinja2Templates) -> Dict[str, Any]:
+    """Pre-open database connections and compile templates, then mark the worker ready"""
+    start = time.perf_counter()
+    startup_state["warm_connections"] = warm_up_pool()
+    startup_state["templates_compiled"] = precompile_templates(templates)
+    startup_state["warmup_seconds"] = round(time.perf_counter() - start, 4)
+    startup_state["ready"] = True
+    return startup_state
+
+def import_time_report(module: str = "app.main", top: int = 25) -> List[Tuple[int, int, str]]:
+    """
+    Import a module in a fresh interpreter with -X importtime
+    
+    Returns:
+        (cumulative_us, self_us, module) tuples, slowest first
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    )
+    
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(cumulative_us), int(self_us), name.strip()))
+    
+    rows.sort(reverse=True)
+    return rows[:top]
@@ -1,11 +1,80 @@
+import os
 from datetime import datetime, timedelta
 from typing import Optional
+from sqlalchemy import bindparam, delete, select, update
 from sqlalchemy.orm import Session
 from app.models.token import EmailVerificationToken, PasswordResetToken
-from app.utils.auth_utils import generate_verification_token, generate_reset_token
+from app.models.user import User
+from app.utils.auth_utils import generate_verification_token, generate_reset_token, hash_password
+from app.utils.cache_bus import publish_invalidation
+from app.utils.signed_tokens import (
+    EMAIL_TOKEN_MODE, PURPOSE_RESET_PASSWORD, PURPOSE_VERIFY_EMAIL, create_signed_token, is_signed_token,
+    password_fingerprint, reset_password_with_signed_token, verification_fingerprint, verify_email_with_signed_token
+)
 
-def create_verification_token(db: Session, user_id: int, expires_in_hours: int = 24) -> EmailVerificationToken:
-    """Create a new email verification token"""
+TOKEN_REUSE_WINDOW_MINUTES = int(os.getenv("TOKEN_REUSE_WINDOW_MINUTES", "15"))
+
+# Hot-path statements are built once; executions only bind parameters and hit the compiled cache.
+# Bind names must differ from column names because UPDATE reserves those for its SET clause.
+def _reusable_token_statement(model):
+    return select(model).where(
+        model.user_id == bindparam("user_id"),
+        model.used == False,
+        model.expires_at > bindparam("now"),
+        model.created_at >= bindparam("issued_after")
+    ).order_by(model.created_at.desc()).limit(1)
+
+def _valid_token_statement(model):
+    return select(model).where(
+        model.token == bindparam("token_value"),
+        model.expires_at > bindparam("now"),
+        model.used == False
+    )
+
+def _consume_token_statement(model):
+    return (
+        update(model)
+        .where(
+            model.token == bindparam("token_value"),
+            model.expires_at > bindparam("now"),
+            model.used == False
+        )
+        .values(used=True)
+        .returning(model.user_id)
+        .execution_options(synchronize_session=False)
+    )
+
+REUSABLE_TOKEN = {model: _reusable_token_statement(model) for model in (EmailVerificationToken, PasswordResetToken)}
+VALID_TOKEN = {model: _valid_token_statement(model) for model in (EmailVerificationToken, PasswordResetToken)}
+CONSUME_TOKEN = {model: _consume_token_statement(model) for model in (EmailVerificationToken, PasswordResetToken)}
+
+def _find_reusable_token(db: Session, model, user_id: int, reuse_window_minutes: int):
+    """Latest unused, unexpired token for the user issued within the reuse window"""
+    now = datetime.utcnow()
+    return db.execute(REUSABLE_TOKEN[model], {
+        "user_id": user_id,
+        "now": now,
+        "issued_after": now - timedelta(minutes=reuse_window_minutes)
+    }).scalar_one_or_none()
+
+def create_verification_token(
+    db: Session,
+    user_id: int,
+    expires_in_hours: int = 24,
+    commit: bool = True,
+    reuse_window_minutes: int = TOKEN_REUSE_WINDOW_MINUTES
+) -> EmailVerificationToken:
+    """
+    Create a new email verification token, or reuse one issued within the reuse window
+    
+    Pass commit=False to join the caller's transaction and reuse_window_minutes=0
+    to always issue a fresh token.
+    """
+    if reuse_window_minutes > 0:
+        existing = _find_reusable_token(db, EmailVerificationToken, user_id, reuse_window_minutes)
+        if existing:
+            return existing
+    
     token = generate_verification_token()
     
     expires_at = datetime.utcnow() + timedelta(hours=expires_in_hours)
@@ -17,35 +86,77 @@ def create_verification_token(db: Session, user_id: int, expires_in_hours: int =
     )
     
     db.add(verification_token)
-    db.commit()
-    db.refresh(verification_token)
+    if commit:
+        db.commit()
+        db.refresh(verification_token)
     
     return verification_token
 
 def get_verification_token(db: Session, token: str) -> Optional[EmailVerificationToken]:
     """Get verification token if it's valid and not expired"""
-    verification_token = db.query(EmailVerificationToken).filter(
-        EmailVerificationToken.token == token,
-        EmailVerificationToken.expires_at > datetime.utcnow(),
-        EmailVerificationToken.used == False
-    ).first()
-    
-    return verification_token
+    return db.execute(
+        VALID_TOKEN[EmailVerificationToken], {"token_value": token, "now": datetime.utcnow()}
+    ).scalar_one_or_none()
 
 def mark_verification_token_used(db: Session, token: str) -> bool:
     """Mark a verification token as used"""
-    verification_token = db.query(EmailVerificationToken).filter(
-        EmailVerificationToken.token == token
-    ).first()
-    
-    if verification_token:
-        verification_token.used = True
-        db.commit()
-        return True
-    return False
+    result = db.execute(
+        update(EmailVerificationToken)
+        .where(EmailVerificationToken.token == token)
+        .values(used=True)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount > 0
+
+def consume_verification_token(db: Session, token: str) -> Optional[int]:
+    """Atomically claim a valid verification token and return its user id (no commit)"""
+    return db.execute(CONSUME_TOKEN[EmailVerificationToken], {"token_value": token, "now": datetime.utcnow()}).scalar_one_or_none()
+
+def issue_verification_token(db: Session, user_id: int, commit: bool = True, reuse_window_minutes: int = TOKEN_REUSE_WINDOW_MINUTES) -> str:
+    """Issue a verification link token: a signed token in signed mode, otherwise a token row"""
+    if EMAIL_TOKEN_MODE == "signed":
+        return create_signed_token(user_id, PURPOSE_VERIFY_EMAIL, verification_fingerprint(False), 24 * 3600)
+    return create_verification_token(db, user_id, commit=commit, reuse_window_minutes=reuse_window_minutes).token
 
-def create_reset_token(db: Session, user_id: int, expires_in_hours: int = 1) -> PasswordResetToken:
-    """Create a new password reset token"""
+def issue_reset_token(db: Session, user: User) -> str:
+    """Issue a password reset link token: a signed token in signed mode, otherwise a token row"""
+    if EMAIL_TOKEN_MODE == "signed":
+        return create_signed_token(user.id, PURPOSE_RESET_PASSWORD, password_fingerprint(user.hashed_password), 3600)
+    return create_reset_token(db, user.id).token
+
+def verify_email_with_token(db: Session, token: str) -> Optional[int]:
+    """Consume a verification token and mark its user verified in one transaction"""
+    if is_signed_token(token):
+        return verify_email_with_signed_token(db, token)
+    
+    user_id = consume_verification_token(db, token)
+    if user_id is None:
+        db.rollback()
+        return None
+    
+    db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(is_verified=True)
+        .execution_options(synchronize_session=False)
+    )
+    publish_invalidation(db, "user", user_id)
+    db.commit()
+    return user_id
+
+def create_reset_token(
+    db: Session,
+    user_id: int,
+    expires_in_hours: int = 1,
+    reuse_window_minutes: int = TOKEN_REUSE_WINDOW_MINUTES
+) -> PasswordResetToken:
+    """Create a new password reset token, or reuse one issued within the reuse window"""
+    if reuse_window_minutes > 0:
+        existing = _find_reusable_token(db, PasswordResetToken, user_id, reuse_window_minutes)
+        if existing:
+            return existing
+    
     token = generate_reset_token()
     
     expires_at = datetime.utcnow() + timedelta(hours=expires_in_hours)
@@ -64,43 +175,67 @@ def create_reset_token(db: Session, user_id: int, expires_in_hours: int = 1) ->
 
 def get_reset_token(db: Session, token: str) -> Optional[PasswordResetToken]:
     """Get reset token if it's valid and not expired"""
-    reset_token = db.query(PasswordResetToken).filter(
-        PasswordResetToken.token == token,
-        PasswordResetToken.expires_at > datetime.utcnow(),
-        PasswordResetToken.used == False
-    ).first()
-    
-    return reset_token
+    return db.execute(
+        VALID_TOKEN[PasswordResetToken], {"token_value": token, "now": datetime.utcnow()}
+    ).scalar_one_or_none()
 
 def mark_reset_token_used(db: Session, token: str) -> bool:
     """Mark a reset token as used"""
-    reset_token = db.query(PasswordResetToken).filter(
-        PasswordResetToken.token == token
-    ).first()
-    
-    if reset_token:
-        reset_token.used = True
-        db.commit()
-        return True
-    return False
+    result = db.execute(
+        update(PasswordResetToken)
+        .where(PasswordResetToken.token == token)
+        .values(used=True)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount > 0
+
+def consume_reset_token(db: Session, token: str) -> Optional[int]:
+    """Atomically claim a valid reset token and return its user id (no commit)"""
+    return db.execute(CONSUME_TOKEN[PasswordResetToken], {"token_value": token, "now": datetime.utcnow()}).scalar_one_or_none()
+
+def reset_password_with_token(db: Session, token: str, new_password: str) -> Optional[int]:
+    """
+    Consume a reset token and set the new password in one transaction
+    
+    A read-only lookup keeps invalid tokens from paying for bcrypt, and the hash
+    is computed before the write starts so no row or writer lock is held during
+    it. The token is then claimed atomically, so concurrent submissions of the
+    same token cannot both succeed.
+    """
+    if is_signed_token(token):
+        return reset_password_with_signed_token(db, token, new_password)
+    
+    valid = get_reset_token(db, token) is not None
+    db.rollback()
+    if not valid:
+        return None
+    
+    hashed_password = hash_password(new_password)
+    
+    user_id = consume_reset_token(db, token)
+    if user_id is None:
+        db.rollback()
+        return None
+    
+    db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(hashed_password=hashed_password)
+        .execution_options(synchronize_session=False)
+    )
+    publish_invalidation(db, "user", user_id)
+    db.commit()
+    return user_id
 
 def cleanup_expired_tokens(db: Session) -> int:
-    """Clean up expired tokens"""
-    expired_verification = db.query(EmailVerificationToken).filter(
-        EmailVerificationToken.expires_at <= datetime.utcnow()
-    ).all()
-    
-    expired_reset = db.query(PasswordResetToken).filter(
-        PasswordResetToken.expires_at <= datetime.utcnow()
-    ).all()
-    
-    count = len(expired_verification) + len(expired_reset)
-    
-    for token in expired_verification:
-        db.delete(token)
-    
-    for token in expired_reset:
-        db.delete(token)
+    """Clean up expired tokens with one DELETE per table"""
+    now = datetime.utcnow()
+    count = 0
+    for model in (EmailVerificationToken, PasswordResetToken):
+        count += db.execute(
+            delete(model).where(model.expires_at <= now).execution_options(synchronize_session=False)
+        ).rowcount
     
     db.commit()
-    return count 
\ No newline at end of file
+    return count
@@ -0,0 +1,301 @@
+import functools
+import json
+import logging
+import os
+import queue
+import random
+import secrets
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+import requests
+from sqlalchemy import event
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none")
+TRACE_EXPORT_FILE = os.getenv("TRACE_EXPORT_FILE", "traces.jsonl")
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "500"))
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "authenticute")
+TRACING_ENABLED = TRACE_EXPORTER in ("file", "otlp")
+
+SPAN_KINDS = {"internal": 1, "server": 2, "client": 3}
+STATUS_OK, STATUS_ERROR = 1, 2
+
+class Span:
+    """A timed operation in a trace, modelled on the OpenTelemetry span data model"""
+    
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "status", "status_message")
+    
+    def __init__(self, trace_id: str, parent_id: Optional[str], name: str, kind: str = "internal", attributes: Dict[str, Any] = None):
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = dict(attributes or {})
+        self.status = STATUS_OK
+        self.status_message = ""
+    
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+    
+    def record_error(self, error: BaseException):
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"
+    
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+    
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1_000_000
+    
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KINDS.get(self.kind, 1),
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [_otlp_attribute(key, value) for key, value in self.attributes.items()],
+            "status": {"code": self.status, "message": self.status_message}
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+class Trace:
+    """Spans collected for one request until the tail-sampling decision"""
+    
+    def __init__(self, trace_id: str, sampled_upstream: bool = False):
+        self.trace_id = trace_id
+        self.sampled_upstream = sampled_upstream
+        self.spans: List[Span] = []
+        self.has_error = False
+
+current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+@contextmanager
+def start_span(name: str, kind: str = "internal", **attributes):
+    """Record a child span of the current span; a no-op outside a traced request"""
+    trace = current_trace.get()
+    if trace is None:
+        yield None
+        return
+    
+    parent = current_span.get()
+    span = Span(trace.trace_id, parent.span_id if parent else None, name, kind, attributes)
+    token = current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_error(e)
+        trace.has_error = True
+        raise
+    finally:
+        span.end()
+        current_span.reset(token)
+        trace.spans.append(span)
+
+def traced(name: str, kind: str = "internal"):
+    """Decorator that wraps a function call in a span"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if current_trace.get() is None:
+                return func(*args, **kwargs)
+            with start_span(name, kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+class SpanExporter(ABC):
+    """Exports kept traces from a background thread so requests never wait on I/O"""
+    
+    def __init__(self, max_queue: int = 1000):
+        self.queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self.exported = 0
+        self.thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self.thread.start()
+    
+    def submit(self, spans: List[Span]):
+        try:
+            self.queue.put_nowait(spans)
+        except queue.Full:
+            self.dropped += 1
+    
+    def _run(self):
+        while True:
+            spans = self.queue.get()
+            try:
+                self.export({
+                    "resourceSpans": [{
+                        "resource": {"attributes": [_otlp_attribute("service.name", TRACE_SERVICE_NAME)]},
+                        "scopeSpans": [{"scope": {"name": "app.utils.tracing"}, "spans": [span.to_otlp() for span in spans]}]
+                    }]
+                })
+                self.exported += 1
+            except Exception as e:
+                logger.warning("Trace export failed", extra={"error_message": str(e)})
+    
+    @abstractmethod
+    def export(self, payload: Dict[str, Any]):
+        """Send one OTLP/JSON payload"""
+
+class FileSpanExporter(SpanExporter):
+    """Append OTLP/JSON payloads, one per line"""
+    
+    def __init__(self, path: str, max_queue: int = 1000):
+        self.path = path
+        super().__init__(max_queue)
+    
+    def export(self, payload: Dict[str, Any]):
+        with open(self.path, "a") as f:
+            f.write(json.dumps(payload, separators=(",", ":")) + "\n")
+
+class OtlpHttpSpanExporter(SpanExporter):
+    """POST OTLP/JSON payloads to a collector's /v1/traces endpoint"""
+    
+    def __init__(self, endpoint: str, max_queue: int = 1000):
+        self.endpoint = endpoint
+        super().__init__(max_queue)
+    
+    def export(self, payload: Dict[str, Any]):
+        requests.post(self.endpoint, json=payload, timeout=5)
+
+_exporter: Optional[SpanExporter] = None
+
+def get_exporter() -> Optional[SpanExporter]:
+    global _exporter
+    if _exporter is None and TRACING_ENABLED:
+        _exporter = FileSpanExporter(TRACE_EXPORT_FILE) if TRACE_EXPORTER == "file" else OtlpHttpSpanExporter(TRACE_OTLP_ENDPOINT)
+    return _exporter
+
+def should_keep(trace: Trace, root: Span) -> bool:
+    """Tail sampling: keep errored, slow and upstream-sampled traces plus a random baseline"""
+    if trace.has_error or root.status == STATUS_ERROR:
+        return True
+    if root.duration_ms >= TRACE_SLOW_MS:
+        return True
+    return trace.sampled_upstream or random.random() < TRACE_SAMPLE_RATE
+
+def parse_traceparent(value: str):
+    """Parse a W3C traceparent header into (trace_id, parent_span_id, sampled)"""
+    parts = value.strip().split("-")
+    if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16), int(parts[3], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1], parts[2], bool(int(parts[3], 16) & 1)
+
+def instrument_engine(engine):
+    """Emit a client span for every SQL statement executed on the engine"""
+    
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        trace = current_trace.get()
+        if trace is None:
+            return
+        parent = current_span.get()
+        context._trace_span = Span(trace.trace_id, parent.span_id if parent else None, "db.query", "client", {
+            "db.system": engine.dialect.name,
+            "db.statement": statement[:1000],
+            "db.executemany": executemany
+        })
+    
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        span = getattr(context, "_trace_span", None)
+        trace = current_trace.get()
+        if span is not None and trace is not None:
+            span.end()
+            trace.spans.append(span)
+    
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        span = getattr(exception_context.execution_context, "_trace_span", None)
+        trace = current_trace.get()
+        if span is not None and trace is not None:
+            span.record_error(exception_context.original_exception)
+            span.end()
+            trace.has_error = True
+            trace.spans.append(span)
+
+class TracingMiddleware:
+    """Root span per HTTP request, continuing any incoming W3C trace context"""
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not TRACING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        
+        incoming = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                incoming = parse_traceparent(value.decode("latin-1"))
+                break
+        trace_id, parent_id, sampled = incoming or (secrets.token_hex(16), None, False)
+        
+        trace = Trace(trace_id, sampled)
+        root = Span(trace_id, parent_id, f"{scope['method']} {scope['path']}", "server", {
+            "http.method": scope["method"],
+            "http.target": scope["path"]
+        })
+        trace_token = current_trace.set(trace)
+        span_token = current_span.set(root)
+        
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                root.set_attribute("http.status_code", message["status"])
+                if message["status"] >= 500:
+                    root.status = STATUS_ERROR
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"traceresponse", f"00-{trace_id}-{root.span_id}-01".encode("latin-1"))
+                ]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_status)
+        except BaseException as e:
+            root.record_error(e)
+            raise
+        finally:
+            root.end()
+            route = scope.get("route")
+            if route is not None and getattr(route, "path", None):
+                root.name = f"{scope['method']} {route.path}"
+            current_span.reset(span_token)
+            current_trace.reset(trace_token)
+            if should_keep(trace, root):
+                exporter = get_exporter()
+                if exporter:
+                    exporter.submit(trace.spans + [root])
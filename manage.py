@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+import argparse
+import sys
+from app.database import SessionLocal
+
+def export_users_command(args):
+    """Export users to NDJSON/CSV with resumable checkpoints"""
+    from app.utils.export_utils import export_users
+    
+    output = args.output or f"users.{args.format}" + (".gz" if args.gzip else "")
+    checkpoint = args.checkpoint or f"{output}.checkpoint"
+    
+    def report(total, last_id):
+        print(f"Exported {total} users (last id {last_id})", file=sys.stderr)
+    
+    db = SessionLocal()
+    try:
+        total = export_users(
+            db,
+            output_path=output,
+            fmt=args.format,
+            compress=args.gzip,
+            batch_size=args.batch_size,
+            checkpoint_path=checkpoint,
+            progress=report
+        )
+    finally:
+        db.close()
+    
+    print(f"Export complete: {total} users written to {output}")
+
+def import_report_command(args):
+    """Show the slowest imports when loading the application"""
+    from app.utils.startup_utils import import_time_report
+    
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative_us, self_us, name in import_time_report(args.module, args.top):
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+
+def build_assets_command(args):
+    """Build the purged, fingerprinted and precompressed CSS bundle"""
+    from app.utils.asset_utils import build_assets, fetch_vendor_assets
+    
+    if args.fetch:
+        for path in fetch_vendor_assets():
+            print(f"Fetched {path}")
+    
+    manifest = build_assets()
+    for name, path in manifest.items():
+        print(f"{name} -> static/{path}")
+
+def purge_users_command(args):
+    """Delete users matching the given criteria in bounded batches"""
+    from app.utils.db_utils import purge_users
+    
+    user_ids = [int(user_id) for user_id in args.ids.split(",")] if args.ids else None
+    if args.unverified_older_than_days is None and user_ids is None:
+        sys.exit("Give --unverified-older-than-days and/or --ids")
+    
+    verb = "Matched" if args.dry_run else "Purged"
+    
+    def report(total, last_id):
+        print(f"{verb} {total} users (last id {last_id})", file=sys.stderr)
+    
+    db = SessionLocal()
+    try:
+        total = purge_users(
+            db,
+            unverified_older_than_days=args.unverified_older_than_days,
+            user_ids=user_ids,
+            batch_size=args.batch_size,
+            dry_run=args.dry_run,
+            progress=report
+        )
+    finally:
+        db.close()
+    
+    print(f"{verb} {total} users" + (" (dry run, nothing deleted)" if args.dry_run else ""))
+
+def refresh_rollups_command(args):
+    """Fold new users and auth events into the analytics rollups"""
+    from app.utils.analytics import refresh_rollups
+    
+    def report(source, rows):
+        print(f"{source}: folded {rows} rows", file=sys.stderr)
+    
+    db = SessionLocal()
+    try:
+        folded = refresh_rollups(db, progress=report)
+    finally:
+        db.close()
+    
+    print(f"Rollups refreshed: {sum(folded.values())} rows folded")
+
+def bench_queries_command(args):
+    """Benchmark hot-path lookups: ad-hoc ORM queries vs precompiled statements"""
+    from app.utils.query_bench import bench_queries
+    
+    print(f"{'query':<20} {'variant':<34} {'us/call':>9}")
+    for row in bench_queries(args.iterations):
+        print(f"{row['query']:<20} {row['variant']:<34} {row['us_per_call']:>9.1f}")
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="AuthentiCute management commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    export_parser = subparsers.add_parser("export-users", help="Export users without password hashes")
+    export_parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    export_parser.add_argument("--gzip", action="store_true", help="Gzip-compress the output")
+    export_parser.add_argument("--output", help="Output file path")
+    export_parser.add_argument("--checkpoint", help="Checkpoint file used to resume an interrupted export")
+    export_parser.add_argument("--batch-size", type=int, default=1000)
+    export_parser.set_defaults(func=export_users_command)
+    
+    import_parser = subparsers.add_parser("import-report", help="Report module import times")
+    import_parser.add_argument("--module", default="app.main")
+    import_parser.add_argument("--top", type=int, default=25)
+    import_parser.set_defaults(func=import_report_command)
+    
+    assets_parser = subparsers.add_parser("build-assets", help="Build the self-hosted CSS bundle")
+    assets_parser.add_argument("--fetch", action="store_true", help="Download vendor CSS and fonts first")
+    assets_parser.set_defaults(func=build_assets_command)
+    
+    purge_parser = subparsers.add_parser("purge-users", help="Delete users in bulk (e.g. stale unverified signups)")
+    purge_parser.add_argument("--unverified-older-than-days", type=int, help="Unverified accounts created more than N days ago")
+    purge_parser.add_argument("--ids", help="Comma-separated user ids")
+    purge_parser.add_argument("--batch-size", type=int, default=500)
+    purge_parser.add_argument("--dry-run", action="store_true", help="Only count matching users")
+    purge_parser.set_defaults(func=purge_users_command)
+    
+    rollups_parser = subparsers.add_parser("refresh-rollups", help="Incrementally refresh analytics rollups")
+    rollups_parser.set_defaults(func=refresh_rollups_command)
+    
+    bench_parser = subparsers.add_parser("bench-queries", help="Benchmark hot-path query overhead")
+    bench_parser.add_argument("--iterations", type=int, default=2000)
+    bench_parser.set_defaults(func=bench_queries_command)
+    
+    return parser
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    args.func(args)
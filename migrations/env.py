@@ -4,7 +4,6 @@ from sqlalchemy import pool
 from alembic import context
 import os
 from dotenv import load_dotenv
-import psycopg
 
 load_dotenv()
 
@@ -14,7 +13,7 @@ if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
 from app.database import Base
-from app.models import User, UserSession, EmailVerificationToken, PasswordResetToken
+from app.models import User, UserSession, EmailVerificationToken, PasswordResetToken, AuthEvent, AuthRollup, RollupWatermark, JobRun
 
 target_metadata = Base.metadata
 
@@ -33,6 +32,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        render_as_batch=bool(url) and url.startswith("sqlite"),
     )
 
     with context.begin_transaction():
@@ -54,8 +54,11 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
+        # SQLite cannot ALTER constraints in place; batch mode recreates the table instead
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=connection.dialect.name == "sqlite"
         )
 
         with context.begin_transaction():
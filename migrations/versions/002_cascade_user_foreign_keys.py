@@ -0,0 +1,44 @@
+"""Cascade user deletes to sessions and tokens in the database
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+# Child tables whose user_id references users.id, with the default
+# PostgreSQL constraint names; SQLite reflects unnamed foreign keys, which
+# the naming convention maps to the same names for batch mode.
+CHILD_TABLES = ['user_sessions', 'email_verification_tokens', 'password_reset_tokens']
+NAMING_CONVENTION = {"fk": "%(table_name)s_%(column_0_name)s_fkey"}
+
+
+def _replace_user_foreign_key(table: str, ondelete) -> None:
+    name = f"{table}_user_id_fkey"
+    with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint(name, type_='foreignkey')
+        batch_op.create_foreign_key(name, 'users', ['user_id'], ['id'], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    for table in CHILD_TABLES:
+        _replace_user_foreign_key(table, 'CASCADE')
+    op.create_index('ix_user_sessions_user_id', 'user_sessions', ['user_id'], unique=False)
+    op.create_index('ix_email_verification_tokens_user_id', 'email_verification_tokens', ['user_id'], unique=False)
+    op.create_index('ix_password_reset_tokens_user_id', 'password_reset_tokens', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_password_reset_tokens_user_id', table_name='password_reset_tokens')
+    op.drop_index('ix_email_verification_tokens_user_id', table_name='email_verification_tokens')
+    op.drop_index('ix_user_sessions_user_id', table_name='user_sessions')
+    for table in CHILD_TABLES:
+        _replace_user_foreign_key(table, None)
@@ -0,0 +1,72 @@
+"""Append-only authentication event log
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from datetime import date
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def _month_start(year: int, month: int) -> date:
+    return date(year + (month - 1) // 12, (month - 1) % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        # Range-partitioned by month; the primary key has to include the partition key
+        op.execute("""
+            CREATE TABLE auth_events (
+                id BIGINT GENERATED BY DEFAULT AS IDENTITY,
+                event_type VARCHAR(32) NOT NULL,
+                user_id INTEGER,
+                email VARCHAR(255),
+                ip_address VARCHAR(45),
+                user_agent VARCHAR(255),
+                detail VARCHAR(64),
+                created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+                PRIMARY KEY (id, created_at)
+            ) PARTITION BY RANGE (created_at)
+        """)
+        today = date.today()
+        for offset in range(3):
+            start = _month_start(today.year, today.month + offset)
+            end = _month_start(today.year, today.month + offset + 1)
+            op.execute(
+                f"CREATE TABLE auth_events_{start:%Y_%m} PARTITION OF auth_events "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            )
+        op.execute("CREATE TABLE auth_events_default PARTITION OF auth_events DEFAULT")
+    else:
+        op.create_table('auth_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('event_type', sa.String(length=32), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('email', sa.String(length=255), nullable=True),
+        sa.Column('ip_address', sa.String(length=45), nullable=True),
+        sa.Column('user_agent', sa.String(length=255), nullable=True),
+        sa.Column('detail', sa.String(length=64), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+        )
+    
+    op.create_index('ix_auth_events_created_at', 'auth_events', ['created_at'], unique=False)
+    op.create_index('ix_auth_events_user_id_created_at', 'auth_events', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_auth_events_ip_address_created_at', 'auth_events', ['ip_address', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_auth_events_ip_address_created_at', table_name='auth_events')
+    op.drop_index('ix_auth_events_user_id_created_at', table_name='auth_events')
+    op.drop_index('ix_auth_events_created_at', table_name='auth_events')
+    # Dropping the parent drops every partition with it
+    op.drop_table('auth_events')
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# app.database builds its engine at import time, so point it at a throwaway database first
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("CACHE_BUS_ENABLED", "false")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
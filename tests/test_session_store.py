@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app import models
+from app.database import Base
+from app.utils import cache_bus
+from app.utils.session_store import MemorySessionStore, SessionStore, SqliteSessionStore, SqlSessionStore, session_cache
+
+NOW = datetime.now(timezone.utc).replace(microsecond=0)
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        models.User(id=1, email="one@example.com", hashed_password="x"),
+        models.User(id=2, email="two@example.com", hashed_password="x")
+    ])
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+@pytest.fixture(params=["sql", "sqlite", "memory"])
+def store(request, tmp_path) -> SessionStore:
+    if request.param == "sql":
+        return SqlSessionStore()
+    if request.param == "sqlite":
+        return SqliteSessionStore(str(tmp_path / "sessions.db"))
+    return MemorySessionStore()
+
+def create(store, db, token, user_id=1, expires_in=timedelta(hours=1), created_at=NOW):
+    return store.create(db, token, user_id, created_at + expires_in, created_at)
+
+def test_base_class_is_abstract():
+    with pytest.raises(TypeError):
+        SessionStore()
+
+def test_create_and_get(store, db):
+    created = create(store, db, "token-a")
+
+    fetched = store.get(db, "token-a")
+
+    assert fetched.id == created.id
+    assert fetched.session_token == "token-a"
+    assert fetched.user_id == 1
+    assert fetched.expires_at == NOW + timedelta(hours=1)
+    assert fetched.created_at == NOW
+    assert fetched.expires_at.tzinfo is not None
+
+def test_get_unknown_token(store, db):
+    create(store, db, "token-a")
+
+    assert store.get(db, "token-b") is None
+
+def test_ids_are_unique(store, db):
+    first = create(store, db, "token-a")
+    second = create(store, db, "token-b")
+
+    assert first.id != second.id
+
+def test_get_returns_expired_sessions(store, db):
+    create(store, db, "token-a", expires_in=timedelta(hours=-1))
+
+    assert store.get(db, "token-a").expires_at < NOW
+
+def test_renew(store, db):
+    first = create(store, db, "token-a")
+    second = create(store, db, "token-b")
+    renewed = NOW + timedelta(hours=5)
+
+    assert store.renew(db, {first.id: renewed}) == 1
+
+    assert store.get(db, "token-a").expires_at == renewed
+    assert store.get(db, "token-b").expires_at == second.expires_at
+
+def test_delete(store, db):
+    created = create(store, db, "token-a")
+    create(store, db, "token-b")
+
+    deleted = store.delete(db, "token-a")
+    assert deleted.id == created.id
+    assert deleted.user_id == 1
+    assert store.delete(db, "token-a") is None
+    assert store.get(db, "token-a") is None
+    assert store.get(db, "token-b") is not None
+
+def test_delete_user(store, db):
+    create(store, db, "token-a", user_id=1)
+    create(store, db, "token-b", user_id=1)
+    create(store, db, "token-c", user_id=2)
+
+    assert store.delete_user(db, 1) == 2
+
+    assert store.get(db, "token-a") is None
+    assert store.get(db, "token-b") is None
+    assert store.get(db, "token-c") is not None
+
+def test_cleanup(store, db):
+    create(store, db, "live")
+    create(store, db, "expired", expires_in=timedelta(minutes=-1))
+    create(store, db, "too-old", created_at=NOW - timedelta(days=30), expires_in=timedelta(days=31))
+
+    assert store.cleanup(db, NOW, NOW - timedelta(days=7)) == 2
+
+    assert store.get(db, "live") is not None
+    assert store.get(db, "expired") is None
+    assert store.get(db, "too-old") is None
+
+@pytest.fixture
+def cache_active():
+    cache_bus._set_listener_connected(True)
+    yield
+    cache_bus._set_listener_connected(False)
+
+def test_sql_renew_refreshes_cached_expiry(db, cache_active):
+    store = SqlSessionStore()
+    created = create(store, db, "token-a")
+    assert store.get(db, "token-a").expires_at == created.expires_at
+    assert session_cache.get(cache_bus.token_digest("token-a")) is not None
+
+    renewed = NOW + timedelta(hours=5)
+    store.renew(db, {created.id: renewed})
+
+    assert store.get(db, "token-a").expires_at == renewed